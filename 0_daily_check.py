@@ -1,7 +1,7 @@
 from ib_insync import *
+import asyncio
+from collections import deque
 import pandas as pd
-from datetime import datetime, timedelta
-import pytz
 pd.set_option('display.max_columns', None)
 pd.set_option('display.max_rows', None)
 pd.set_option('display.float_format', lambda x: '${:,.2f}'.format(x) if isinstance(x, (float, int)) else str(x))
@@ -11,11 +11,16 @@ pd.set_option('display.colheader_justify', 'center')
 class IBPortfolioMonitor:
     def __init__(self):
         self.ib = IB()
+        self._fills = deque(maxlen=5000)
         
     def connect(self, host='127.0.0.1', port=4002, clientId=2):
         """Connect to TWS or IB Gateway"""
         try:
             self.ib.connect(host, port, clientId)
+            # Seed with the executions synced on connect; fills still waiting
+            # for a commission report are picked up by the event below
+            self._fills.extend(f for f in self.ib.fills() if f.commissionReport.execId)
+            self.ib.commissionReportEvent += self._on_commission_report
             return True
         except Exception as e:
             print("\n" + "="*50)
@@ -23,18 +28,29 @@ class IBPortfolioMonitor:
             print("="*50)
             return False
             
-    def format_currency(self, value):
-        """Format currency values with color indicators"""
-        try:
-            val = float(value)
-            return f"${val:,.2f}"
-        except:
-            return str(value)
+    def _on_commission_report(self, trade, fill, report):
+        """Cache fills as IB pushes them instead of polling reqExecutions"""
+        self._fills.append(fill)
+            
+    def format_currency(self, values):
+        """Format a column of currency values, leaving non-numeric entries as text"""
+        numeric = pd.to_numeric(values, errors='coerce')
+        return numeric.map('${:,.2f}'.format, na_action='ignore').fillna(values.astype(str))
+            
+    async def fetch_all_async(self):
+        """Request account summary and open orders concurrently"""
+        account_values, orders = await asyncio.gather(
+            self.ib.accountSummaryAsync(),
+            self.ib.reqAllOpenOrdersAsync()
+        )
+        # Portfolio and fills are kept up to date locally, no round-trip needed
+        return account_values, self.ib.portfolio(), orders, list(self._fills)
             
-    def get_account_summary(self):
+    def get_account_summary(self, account_values=None):
         """Get account summary including cash balance, equity, etc."""
         summary = {}
-        account_values = self.ib.accountSummary()
+        if account_values is None:
+            account_values = self.ib.accountSummary()
         
         # Create a mapping of essential fields we want to display
         essential_fields = {
@@ -69,137 +85,112 @@ class IBPortfolioMonitor:
         
         return df
         
-    def get_portfolio_positions(self):
+    def get_portfolio_positions(self, portfolio=None):
         """Get current portfolio positions with details"""
-        portfolio = self.ib.portfolio()
+        if portfolio is None:
+            portfolio = self.ib.portfolio()
+        
+        if not portfolio:
+            return pd.DataFrame()
+        
+        # Let ib_insync build the frame straight from the PortfolioItem tuples
+        df = util.df(portfolio, [
+            'contract', 'position', 'marketPrice', 'marketValue',
+            'averageCost', 'unrealizedPNL', 'realizedPNL'
+        ])
+        
+        df = df.rename(columns={
+            'position': 'Position',
+            'marketPrice': 'Market Price',
+            'marketValue': 'Market Value',
+            'averageCost': 'Avg Cost',
+            'unrealizedPNL': 'Unrealized P&L',
+            'realizedPNL': 'Realized P&L'
+        })
+        df.insert(0, 'Symbol', [c.symbol for c in df.pop('contract')])
+        df['Total P&L'] = df['Unrealized P&L'] + df['Realized P&L']
+        
+        # Add totals row (column sums straight from the float block)
+        numeric_cols = df.columns.drop('Symbol')
+        totals = df[numeric_cols].to_numpy(dtype=float).sum(axis=0)
+        df.loc[len(df)] = ['TOTAL', *totals]
+        
+        # Format specific columns
+        df['Position'] = df['Position'].map('{:,.0f}'.format)  # Format as integer with commas
+        money_cols = numeric_cols.drop('Position')
+        df[money_cols] = df[money_cols].apply(self.format_currency)  # Format as currency
         
-        positions = []
-        for position in portfolio:
-            pos_data = {
-                'Symbol': position.contract.symbol,
-                'Position': position.position,
-                'Market Price': position.marketPrice,
-                'Market Value': position.marketValue,
-                'Avg Cost': position.averageCost,
-                'Unrealized P&L': position.unrealizedPNL,
-                'Realized P&L': position.realizedPNL,
-                'Total P&L': position.unrealizedPNL + position.realizedPNL
-            }
-            positions.append(pos_data)
-            
-        df = pd.DataFrame(positions)
-        if not df.empty:
-            # Add totals row
-            totals = df.sum(numeric_only=True)
-            totals['Symbol'] = 'TOTAL'
-            df = df._append(totals, ignore_index=True)
-            
-            # Reorder columns
-            column_order = [
-                'Symbol', 'Position', 'Market Price', 'Market Value',
-                'Avg Cost', 'Unrealized P&L', 'Realized P&L', 'Total P&L'
-            ]
-            df = df[column_order]
-            
-            # Format specific columns
-            for col in df.columns:
-                if col == 'Position':
-                    df[col] = df[col].apply(lambda x: f"{x:,.0f}")  # Format as integer with commas
-                elif col != 'Symbol':
-                    df[col] = df[col].apply(self.format_currency)  # Format as currency
-                    
         return df
         
-    def get_open_orders(self):
+    def get_open_orders(self, orders=None):
         """Get all open orders"""
-        orders = self.ib.openOrders()
-        
-        order_details = []
-        for order in orders:
-            order_data = {
-                'Symbol': order.contract.symbol,
-                'Action': order.order.action,
-                'Type': order.order.orderType,
-                'Quantity': order.order.totalQuantity,
-                'Price': order.order.lmtPrice if hasattr(order.order, 'lmtPrice') else None,
-                'Stop Price': order.order.auxPrice if hasattr(order.order, 'auxPrice') else None,
-                'Status': order.orderStatus.status
-            }
-            order_details.append(order_data)
-            
-        df = pd.DataFrame(order_details)
-        if not df.empty:
-            # Format numeric columns
-            if 'Price' in df.columns:
-                df['Price'] = df['Price'].apply(self.format_currency)
-            if 'Stop Price' in df.columns:
-                df['Stop Price'] = df['Stop Price'].apply(self.format_currency)
+        if orders is None:
+            orders = self.ib.openTrades()
+        
+        if not orders:
+            return pd.DataFrame()
+        
+        # Let ib_insync build the order columns straight from the Order dataclasses
+        df = util.df([t.order for t in orders], [
+            'action', 'orderType', 'totalQuantity', 'lmtPrice', 'auxPrice'
+        ])
+        
+        df = df.rename(columns={
+            'action': 'Action',
+            'orderType': 'Type',
+            'totalQuantity': 'Quantity',
+            'lmtPrice': 'Price',
+            'auxPrice': 'Stop Price'
+        })[['Action', 'Type', 'Quantity', 'Price', 'Stop Price']]
+        df.insert(0, 'Symbol', [t.contract.symbol for t in orders])
+        df['Status'] = [t.orderStatus.status for t in orders]
+        
+        # Format numeric columns
+        money_cols = ['Price', 'Stop Price']
+        df[money_cols] = df[money_cols].apply(self.format_currency)
         return df
         
-    def get_order_history(self):
+    def get_order_history(self, trades=None):
         """Get execution history for the current session with essential trade details"""
-        trades = self.ib.reqExecutions()
-        # Get current time in US/Eastern timezone
-        eastern_tz = pytz.timezone('US/Eastern')
-        now = datetime.now(eastern_tz)
-        yesterday = now - timedelta(days=1)
-        yesterday = yesterday.replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        trade_details = []
-        for trade in trades:
-            # Convert trade time to US/Eastern
-            trade_time = trade.time.astimezone(eastern_tz)
-            
-            # Skip if trade is older than yesterday
-            if trade_time < yesterday:
-                continue
-                
-            # Extract essential trade information
-            trade_data = {
-                'Time': trade_time.strftime('%Y-%m-%d %H:%M:%S'),
-                'Symbol': trade.contract.symbol,
-                'Side': trade.execution.side,
-                'Quantity': trade.execution.shares,
-                'Exchange': trade.execution.exchange,
-                'Order ID': trade.execution.orderId,
-                'Avg Price': trade.execution.avgPrice,
-                'Commission': trade.commissionReport.commission
-            }
-            trade_details.append(trade_data)
-            
-        df = pd.DataFrame(trade_details)
+        if trades is None:
+            trades = list(self._fills)
+        
+        df = pd.DataFrame({
+            'Time': [t.time for t in trades],
+            'Symbol': [t.contract.symbol for t in trades],
+            'Side': [t.execution.side for t in trades],
+            'Quantity': [t.execution.shares for t in trades],
+            'Exchange': [t.execution.exchange for t in trades],
+            'Order ID': [t.execution.orderId for t in trades],
+            'Avg Price': [t.execution.avgPrice for t in trades],
+            'Commission': [t.commissionReport.commission for t in trades]
+        })
         if not df.empty:
+            # Convert trade times to US/Eastern and keep only trades since yesterday
+            df['Time'] = pd.to_datetime(df['Time'], utc=True).dt.tz_convert('US/Eastern')
+            yesterday = pd.Timestamp.now(tz='US/Eastern').normalize() - pd.Timedelta(days=1)
+            df = df[df['Time'] >= yesterday]
+            
             # Sort by time
             df = df.sort_values('Time', ascending=False)
+            df['Time'] = df['Time'].dt.strftime('%Y-%m-%d %H:%M:%S')
             
             # Format numeric columns
-            df['Avg Price'] = df['Avg Price'].apply(self.format_currency)
-            df['Commission'] = df['Commission'].apply(self.format_currency)
-            df['Quantity'] = df['Quantity'].apply(lambda x: f"{x:,.0f}")
-            
-            # Add summary row
-            summary = pd.DataFrame([{
-                'Time': '',
-                'Symbol': '',
-                'Side': '',
-                'Quantity': '',
-                'Exchange': '',
-                'Order ID': '',
-                'Avg Price': '',
-                'Commission': ''
-            }])
-            
-            df = pd.concat([df, summary], ignore_index=True)
+            money_cols = ['Avg Price', 'Commission']
+            df[money_cols] = df[money_cols].apply(self.format_currency)
+            df['Quantity'] = df['Quantity'].map('{:,.0f}'.format)
             
         return df
         
-    def show_all_details(self):
+    async def show_all_details(self):
         """Show all portfolio details including positions, orders, and PnL"""
+        account_values, portfolio, orders, executions = await self.fetch_all_async()
+        
         # Account Summary
         print("\n" + "="*80)
         print(" "*30 + "ACCOUNT SUMMARY")
         print("="*80)
-        summary_df = self.get_account_summary()
+        summary_df = self.get_account_summary(account_values)
         if summary_df.empty:
             print("No account summary available")
         else:
@@ -209,7 +200,7 @@ class IBPortfolioMonitor:
         print("\n" + "="*80)
         print(" "*30 + "PORTFOLIO POSITIONS")
         print("="*80)
-        positions_df = self.get_portfolio_positions()
+        positions_df = self.get_portfolio_positions(portfolio)
         if positions_df.empty:
             print("No positions found")
         else:
@@ -219,7 +210,7 @@ class IBPortfolioMonitor:
         print("\n" + "="*80)
         print(" "*30 + "OPEN ORDERS")
         print("="*80)
-        orders_df = self.get_open_orders()
+        orders_df = self.get_open_orders(orders)
         if orders_df.empty:
             print("No open orders")
         else:
@@ -229,7 +220,7 @@ class IBPortfolioMonitor:
         print("\n" + "="*80)
         print(" "*30 + "RECENT EXECUTIONS")
         print("="*80)
-        executions_df = self.get_order_history()
+        executions_df = self.get_order_history(executions)
         if executions_df.empty:
             print("No recent executions")
         else:
@@ -251,7 +242,7 @@ if __name__ == "__main__":
     if monitor.connect():
         try:
             # Show all portfolio details
-            monitor.show_all_details()
+            util.run(monitor.show_all_details())
         finally:
             # Disconnect when done
             monitor.disconnect() 
\ No newline at end of file
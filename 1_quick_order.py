@@ -1,18 +1,37 @@
 from ib_insync import *
+import atexit
 import sys
 import datetime
 import pytz
 
+# Shared IB connection, reused across orders and closed at process exit
+_ib = None
+
+def get_ib_connection():
+    global _ib
+    if _ib is None or not _ib.isConnected():
+        _ib = IB()
+        _ib.connect('127.0.0.1', 4002, clientId=120)
+    return _ib
+
+def disconnect_ib():
+    if _ib is not None and _ib.isConnected():
+        _ib.disconnect()
+
+atexit.register(disconnect_ib)
+
+EASTERN_TZ = pytz.timezone('US/Eastern')
+
+# Regular market hours are 9:30 AM to 4:00 PM Eastern, in minutes since midnight
+MARKET_OPEN_MINUTE = 9 * 60 + 30
+MARKET_CLOSE_MINUTE = 16 * 60
+
 def is_regular_market_hours():
     # Get current time in US/Eastern
-    eastern = pytz.timezone('US/Eastern')
-    now = datetime.datetime.now(eastern)
-    
-    # Regular market hours are 9:30 AM to 4:00 PM Eastern
-    market_start = now.replace(hour=9, minute=30, second=0, microsecond=0)
-    market_end = now.replace(hour=16, minute=0, second=0, microsecond=0)
+    now = datetime.datetime.now(EASTERN_TZ)
+    minute_of_day = now.hour * 60 + now.minute
     
-    return market_start <= now <= market_end
+    return MARKET_OPEN_MINUTE <= minute_of_day < MARKET_CLOSE_MINUTE
 
 def adjust_price_for_extended_hours(price, action):
     # For pre/post market:
@@ -30,21 +49,17 @@ def place_quick_order(symbol, quantity, action):
         print("Error: Action must be either 'BUY' or 'SELL'")
         return
         
-    # Create IB connection
-    ib = IB()
-    
     try:
-        # Connect to IB TWS or IB Gateway
-        ib.connect('127.0.0.1', 4002, clientId=120)
+        # Connect to IB TWS or IB Gateway (reuses the open connection)
+        ib = get_ib_connection()
         
         # Create stock contract
         contract = Stock(symbol, 'SMART', 'USD')
         
         is_regular_hours = is_regular_market_hours()
         
-        # Get current market price
-        ticker = ib.reqMktData(contract)
-        ib.sleep(1)  # Wait for market data to arrive
+        # Get current market price (returns as soon as the snapshot arrives)
+        ticker, = ib.reqTickers(contract)
         
         if is_regular_hours:
             # During regular hours, use market order
@@ -68,18 +83,14 @@ def place_quick_order(symbol, quantity, action):
         print(f'Action: {action}, Quantity: {quantity}')
         
         # Wait for order to fill
-        while not trade.isDone():
-            ib.sleep(1)  # Wait for 1 second
+        if not trade.isDone():
+            ib.run(trade.doneEvent)
             
         print(f'Order Status: {trade.orderStatus.status}')
         print(f'Filled at: {trade.orderStatus.avgFillPrice}')
             
     except Exception as e:
         print(f'Error: {str(e)}')
-        
-    finally:
-        # Disconnect from IB
-        ib.disconnect()
 
 if __name__ == '__main__':
     # symbol = "NVDA"
@@ -10,23 +10,148 @@ from datetime import datetime
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-def load_trading_data(csv_file="trading_records.csv"):
-    """Load trading data from CSV file."""
+# Column types applied once at load time so the analyzers don't re-coerce.
+# Only these columns are read from the CSV; any missing from the file are
+# added as empty columns.
+CSV_DTYPES = {
+    'Symbol': 'category',
+    'Signal_Type': 'category',
+    'Action': 'category',
+    'Exit_Reason': 'category'
+}
+# Numeric columns are coerced after parsing instead, so a blank or malformed
+# cell becomes missing rather than failing the whole read
+NUMERIC_DTYPES = {
+    'Shares': 'Int64',  # only if every value is whole, see coerce_numeric
+    'Entry_Price': 'float64',
+    'Exit_Price': 'float64',
+    'PnL_Dollar': 'float64',
+    'PnL_Percent': 'float64',
+    'Duration_Minutes': 'float64'
+}
+CSV_COLUMNS = ['Entry_Time'] + list(CSV_DTYPES) + list(NUMERIC_DTYPES)
+
+# Rows per chunk when streaming the CSV
+CHUNK_SIZE = 200_000
+
+# Columns the completed trades are summarized by; 'All' groups every trade
+GROUP_COLUMNS = ['Symbol', 'Signal_Type', 'Exit_Reason', 'All']
+
+# Sums and counts that add up across chunks; means are only taken at the end.
+# Counts are of non-missing values, matching what pandas' count / mean skip
+PARTIAL_AGGS = {
+    'Rows': ('Win', 'size'),
+    'PnL_Count': ('PnL_Dollar', 'count'),
+    'PnL_Sum': ('PnL_Dollar', 'sum'),
+    'Pct_Count': ('PnL_Percent', 'count'),
+    'Pct_Sum': ('PnL_Percent', 'sum'),
+    'Duration_Count': ('Duration_Minutes', 'count'),
+    'Duration_Sum': ('Duration_Minutes', 'sum'),
+    'Wins': ('Win', 'sum'),
+    'Win_PnL_Sum': ('Win_PnL', 'sum'),
+    'Losses': ('Loss', 'sum'),
+    'Loss_PnL_Sum': ('Loss_PnL', 'sum')
+}
+
+def partial_exit_stats(exit_trades):
+    """Reduce one chunk of EXIT rows to PARTIAL_AGGS per group of each GROUP_COLUMNS entry."""
+    pnl = exit_trades['PnL_Dollar']
+    exit_trades = exit_trades.assign(
+        Win=pnl > 0, Loss=pnl < 0,
+        Win_PnL=pnl.where(pnl > 0, 0.0), Loss_PnL=pnl.where(pnl < 0, 0.0),
+        All='All'
+    )
+    return {col: exit_trades.groupby(col, observed=True).agg(**PARTIAL_AGGS) for col in GROUP_COLUMNS}
+
+def coerce_numeric(chunk):
+    """Convert a chunk's NUMERIC_DTYPES columns in place; bad cells become missing."""
+    for col, dtype in NUMERIC_DTYPES.items():
+        values = pd.to_numeric(chunk[col], errors='coerce')
+        # Integer columns stay float if any value has a fraction, so nothing is lost
+        if pd.api.types.is_integer_dtype(dtype) and not (values.dropna() % 1 == 0).all():
+            dtype = 'float64'
+        chunk[col] = values.astype(dtype)
+
+def latest_trades(df, n):
+    """
+    Return the n most recent rows, newest first.
+    
+    Rows with the same Entry_Time are ordered by Action, descending, so a
+    trade's EXIT row comes before its ENTRY row as with the original sort.
+    """
+    # nlargest narrows to the candidates (keeping every tie at the cut-off)
+    # so only a handful of rows are fully sorted
+    candidates = df.nlargest(n, 'Entry_Time', keep='all')
+    return candidates.sort_values(['Entry_Time', 'Action'], ascending=False).head(n)
+
+def load_trading_data(csv_file="trading_records.csv", recent_n=10):
+    """Load trading data from CSV file.
+    
+    The file is streamed in chunks and each chunk's completed (EXIT) trades
+    are reduced to per-group sums and counts straight away, so memory stays
+    bounded by the number of groups rather than the size of the file.
+    
+    Returns a (recent_trades, exit_stats) tuple: the recent_n most recent
+    records of any action, and a dict mapping each GROUP_COLUMNS entry to a
+    frame of PARTIAL_AGGS per group. Both are None if the file can't be loaded.
+    """
     if not os.path.exists(csv_file):
         print(f"❌ Trading records file not found: {csv_file}")
-        return None
+        return None, None
     
     try:
-        df = pd.read_csv(csv_file)
-        print(f"✅ Loaded {len(df)} trading records from {csv_file}")
-        return df
+        total_rows = 0
+        partials = {col: [] for col in GROUP_COLUMNS}
+        recent_trades = None
+        for chunk in pd.read_csv(csv_file, engine='c', usecols=lambda col: col in CSV_COLUMNS,
+                                 dtype=CSV_DTYPES, chunksize=CHUNK_SIZE):
+            if total_rows == 0:
+                missing = [col for col in CSV_COLUMNS if col not in chunk.columns]
+                if missing:
+                    print(f"⚠️  Columns missing from {csv_file}: {', '.join(missing)}")
+            total_rows += len(chunk)
+            chunk = chunk.reindex(columns=CSV_COLUMNS)
+            coerce_numeric(chunk)
+            # Unparseable times become NaT instead of leaving the column as text
+            chunk['Entry_Time'] = pd.to_datetime(chunk['Entry_Time'], errors='coerce')
+            for col, stats in partial_exit_stats(chunk[chunk['Action'] == 'EXIT']).items():
+                partials[col].append(stats)
+            # Keep a running top-n so the full file never has to be held
+            recent_trades = latest_trades(pd.concat([recent_trades, chunk]), recent_n)
+        print(f"✅ Loaded {total_rows} trading records from {csv_file}")
+        
+        # Category sets differ per chunk, so the partials are combined by label;
+        # a header-only file has no chunks and gets empty tables
+        exit_stats = {
+            col: pd.concat(frames).groupby(level=0).sum() if frames else pd.DataFrame(columns=list(PARTIAL_AGGS))
+            for col, frames in partials.items()
+        }
+        return recent_trades, exit_stats
     except Exception as e:
         print(f"❌ Error loading CSV: {e}")
-        return None
+        return None, None
+
+def group_summary(stats):
+    """Turn a frame of PARTIAL_AGGS into the per-group trade statistics."""
+    return pd.DataFrame({
+        'Trades': stats['PnL_Count'],
+        'Total_PnL': stats['PnL_Sum'],
+        'Avg_PnL': stats['PnL_Sum'] / stats['PnL_Count'],
+        'Avg_PnL_Pct': stats['Pct_Sum'] / stats['Pct_Count'],
+        'Avg_Duration': stats['Duration_Sum'] / stats['Duration_Count'],
+        'Win_Rate': stats['Wins'] / stats['Rows'] * 100
+    })
+
+def overall_stats(exit_stats):
+    """Sums and counts over every completed trade, as a Series (all zero if there are none)."""
+    overall = exit_stats['All']
+    if len(overall) == 0:
+        return pd.Series(0, index=list(PARTIAL_AGGS))
+    return overall.iloc[0]
 
-def analyze_trading_performance(df):
+def analyze_trading_performance(exit_stats):
     """Analyze overall trading performance."""
-    if df is None or len(df) == 0:
+    if exit_stats is None:
         print("No data to analyze")
         return
     
@@ -34,28 +159,21 @@ def analyze_trading_performance(df):
     print("TRADING PERFORMANCE ANALYSIS")
     print("="*60)
     
-    # Filter only EXIT records for P&L analysis
-    exit_trades = df[df['Action'] == 'EXIT'].copy()
-    
-    if len(exit_trades) == 0:
+    overall = overall_stats(exit_stats)
+    if overall['Rows'] == 0:
         print("No completed trades found")
         return
     
-    # Convert numeric columns
-    exit_trades['PnL_Dollar'] = pd.to_numeric(exit_trades['PnL_Dollar'], errors='coerce')
-    exit_trades['PnL_Percent'] = pd.to_numeric(exit_trades['PnL_Percent'], errors='coerce')
-    exit_trades['Duration_Minutes'] = pd.to_numeric(exit_trades['Duration_Minutes'], errors='coerce')
-    
     # Basic statistics
-    total_trades = len(exit_trades)
-    winning_trades = len(exit_trades[exit_trades['PnL_Dollar'] > 0])
-    losing_trades = len(exit_trades[exit_trades['PnL_Dollar'] < 0])
+    total_trades = int(overall['Rows'])
+    winning_trades = int(overall['Wins'])
+    losing_trades = int(overall['Losses'])
     win_rate = (winning_trades / total_trades) * 100 if total_trades > 0 else 0
     
-    total_pnl = exit_trades['PnL_Dollar'].sum()
-    avg_pnl = exit_trades['PnL_Dollar'].mean()
-    avg_win = exit_trades[exit_trades['PnL_Dollar'] > 0]['PnL_Dollar'].mean() if winning_trades > 0 else 0
-    avg_loss = exit_trades[exit_trades['PnL_Dollar'] < 0]['PnL_Dollar'].mean() if losing_trades > 0 else 0
+    total_pnl = overall['PnL_Sum']
+    avg_pnl = overall['PnL_Sum'] / overall['PnL_Count'] if overall['PnL_Count'] > 0 else float('nan')
+    avg_win = overall['Win_PnL_Sum'] / winning_trades if winning_trades > 0 else 0
+    avg_loss = overall['Loss_PnL_Sum'] / losing_trades if losing_trades > 0 else 0
     
     print(f"📊 OVERALL STATISTICS")
     print(f"Total Trades: {total_trades}")
@@ -71,86 +189,53 @@ def analyze_trading_performance(df):
     print(f"Risk/Reward Ratio: {abs(avg_win/avg_loss):.2f}" if avg_loss != 0 else "N/A")
     
     # Duration analysis
-    avg_duration = exit_trades['Duration_Minutes'].mean()
+    avg_duration = (overall['Duration_Sum'] / overall['Duration_Count']
+                    if overall['Duration_Count'] > 0 else float('nan'))
     print(f"")
     print(f"⏱️  DURATION ANALYSIS")
     print(f"Average Trade Duration: {avg_duration:.1f} minutes")
     
-    return exit_trades
+    return exit_stats
 
-def analyze_by_symbol(df):
+def analyze_by_symbol(exit_stats):
     """Analyze performance by symbol."""
-    if df is None or len(df) == 0:
+    if exit_stats is None or overall_stats(exit_stats)['Rows'] == 0:
         return
     
     print("\n" + "="*60)
     print("PERFORMANCE BY SYMBOL")
     print("="*60)
     
-    exit_trades = df[df['Action'] == 'EXIT'].copy()
-    exit_trades['PnL_Dollar'] = pd.to_numeric(exit_trades['PnL_Dollar'], errors='coerce')
-    
-    symbol_stats = exit_trades.groupby('Symbol').agg({
-        'PnL_Dollar': ['count', 'sum', 'mean'],
-        'PnL_Percent': 'mean',
-        'Duration_Minutes': 'mean'
-    }).round(2)
-    
-    symbol_stats.columns = ['Trades', 'Total_PnL', 'Avg_PnL', 'Avg_PnL_Pct', 'Avg_Duration']
-    
-    # Calculate win rates
-    win_rates = []
-    for symbol in symbol_stats.index:
-        symbol_trades = exit_trades[exit_trades['Symbol'] == symbol]
-        wins = len(symbol_trades[symbol_trades['PnL_Dollar'] > 0])
-        total = len(symbol_trades)
-        win_rate = (wins / total) * 100 if total > 0 else 0
-        win_rates.append(win_rate)
-    
-    symbol_stats['Win_Rate'] = win_rates
+    # Win_Rate is left unrounded, as the per-symbol loop used to produce it
+    symbol_stats = group_summary(exit_stats['Symbol'])
+    symbol_stats = symbol_stats.round(dict.fromkeys(symbol_stats.columns.drop('Win_Rate'), 2))
     
     print(symbol_stats)
 
-def analyze_by_signal_type(df):
+def analyze_by_signal_type(exit_stats):
     """Analyze performance by signal type (BUY vs SELL)."""
-    if df is None or len(df) == 0:
+    if exit_stats is None or overall_stats(exit_stats)['Rows'] == 0:
         return
     
     print("\n" + "="*60)
     print("PERFORMANCE BY SIGNAL TYPE")
     print("="*60)
     
-    exit_trades = df[df['Action'] == 'EXIT'].copy()
-    exit_trades['PnL_Dollar'] = pd.to_numeric(exit_trades['PnL_Dollar'], errors='coerce')
-    
-    signal_stats = exit_trades.groupby('Signal_Type').agg({
-        'PnL_Dollar': ['count', 'sum', 'mean'],
-        'PnL_Percent': 'mean',
-        'Duration_Minutes': 'mean'
-    }).round(2)
-    
-    signal_stats.columns = ['Trades', 'Total_PnL', 'Avg_PnL', 'Avg_PnL_Pct', 'Avg_Duration']
+    signal_stats = group_summary(exit_stats['Signal_Type']).drop(columns='Win_Rate').round(2)
     
     print(signal_stats)
 
-def analyze_exit_reasons(df):
+def analyze_exit_reasons(exit_stats):
     """Analyze exit reasons."""
-    if df is None or len(df) == 0:
+    if exit_stats is None or overall_stats(exit_stats)['Rows'] == 0:
         return
     
     print("\n" + "="*60)
     print("EXIT REASONS ANALYSIS")
     print("="*60)
     
-    exit_trades = df[df['Action'] == 'EXIT'].copy()
-    exit_trades['PnL_Dollar'] = pd.to_numeric(exit_trades['PnL_Dollar'], errors='coerce')
-    
-    reason_stats = exit_trades.groupby('Exit_Reason').agg({
-        'PnL_Dollar': ['count', 'sum', 'mean'],
-        'PnL_Percent': 'mean'
-    }).round(2)
-    
-    reason_stats.columns = ['Count', 'Total_PnL', 'Avg_PnL', 'Avg_PnL_Pct']
+    reason_stats = (group_summary(exit_stats['Exit_Reason'])[['Trades', 'Total_PnL', 'Avg_PnL', 'Avg_PnL_Pct']]
+                    .rename(columns={'Trades': 'Count'}).round(2))
     
     print(reason_stats)
 
@@ -163,9 +248,8 @@ def show_recent_trades(df, n=10):
     print(f"RECENT {n} TRADES")
     print("="*60)
     
-    # Sort by entry time and show recent trades
-    df_sorted = df.sort_values('Entry_Time', ascending=False)
-    recent = df_sorted.head(n)
+    # Pick the n latest entries without sorting the whole frame
+    recent = latest_trades(df, n)
     
     # Select key columns for display
     display_cols = ['Entry_Time', 'Symbol', 'Signal_Type', 'Action', 'Shares', 'Entry_Price', 'Exit_Price', 'PnL_Dollar', 'Exit_Reason']
@@ -173,24 +257,23 @@ def show_recent_trades(df, n=10):
     
     print(recent[available_cols].to_string(index=False))
 
-def export_summary_report(df, filename="trading_summary.txt"):
+def export_summary_report(exit_stats, filename="trading_summary.txt"):
     """Export a summary report to a text file."""
-    if df is None or len(df) == 0:
+    if exit_stats is None:
         return
     
+    overall = overall_stats(exit_stats)
+    
     with open(filename, 'w') as f:
         f.write("TRADING PERFORMANCE SUMMARY REPORT\n")
         f.write("=" * 50 + "\n")
         f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
         
-        exit_trades = df[df['Action'] == 'EXIT'].copy()
-        exit_trades['PnL_Dollar'] = pd.to_numeric(exit_trades['PnL_Dollar'], errors='coerce')
-        
-        if len(exit_trades) > 0:
-            total_trades = len(exit_trades)
-            winning_trades = len(exit_trades[exit_trades['PnL_Dollar'] > 0])
+        if overall['Rows'] > 0:
+            total_trades = int(overall['Rows'])
+            winning_trades = int(overall['Wins'])
             win_rate = (winning_trades / total_trades) * 100
-            total_pnl = exit_trades['PnL_Dollar'].sum()
+            total_pnl = overall['PnL_Sum']
             
             f.write(f"Total Completed Trades: {total_trades}\n")
             f.write(f"Winning Trades: {winning_trades}\n")
@@ -207,19 +290,19 @@ def main():
     print("=" * 60)
     
     # Load data
-    df = load_trading_data()
-    if df is None:
+    recent_trades, exit_stats = load_trading_data()
+    if exit_stats is None:
         return
     
     # Run analysis
-    exit_trades = analyze_trading_performance(df)
-    analyze_by_symbol(df)
-    analyze_by_signal_type(df)
-    analyze_exit_reasons(df)
-    show_recent_trades(df)
+    analyze_trading_performance(exit_stats)
+    analyze_by_symbol(exit_stats)
+    analyze_by_signal_type(exit_stats)
+    analyze_exit_reasons(exit_stats)
+    show_recent_trades(recent_trades)
     
     # Export summary
-    export_summary_report(df)
+    export_summary_report(exit_stats)
     
     print(f"\n✅ Analysis complete!")
     print(f"📊 Data file: trading_records.csv")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Color Detector
+Detects one or more colors in an image using precise RGB analysis.
+The image is loaded and its colors counted once, however many colors are requested.
+"""
+
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from color_detection_tools.unified_color_detector import UnifiedColorDetector
+
+# Banner emoji and an optional hint shown when nothing is found, per color
+COLOR_DETAILS = {
+    'purple': ('🟣', None),
+    'blue': ('🔵', None),
+    'yellow': ('🟡', None),
+    'orange': ('🟠', None),
+    'red': ('🔴', None),
+    'green': ('🟢', None),
+    'gray': ('⚪', None),
+    'fuchsia': ('🟣', None),
+    'aqua': ('🔵💚', 'Aqua colors require high blue AND green components with low red'),
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Detect colors in an image.")
+    parser.add_argument('--image', default='cropped_images/test.png',
+                        help="Image to analyze (default: %(default)s)")
+    parser.add_argument('--colors', '--color', default='purple',
+                        help="Comma-separated colors to detect, e.g. blue,fuchsia "
+                             f"(available: {', '.join(COLOR_DETAILS)})")
+    parser.add_argument('--output-dir', default='color_analysis_results',
+                        help="Directory to save results (default: %(default)s)")
+    parser.add_argument('--downsample', type=int, default=1,
+                        help="Keep every n-th row and column in the saved visualizations; "
+                             "pixel counts still use the full image (default: %(default)s)")
+    return parser.parse_args()
+
+def main():
+    """Detect the requested colors in the target image."""
+    args = parse_args()
+    colors = [c.strip().lower() for c in args.colors.split(',') if c.strip()]
+
+    if not os.path.exists(args.image):
+        print(f"❌ Target image '{args.image}' not found.")
+        return
+
+    # Create detector
+    detector = UnifiedColorDetector(args.image, output_dir=args.output_dir)
+
+    unknown = [c for c in colors if c not in detector.color_rules]
+    if unknown:
+        print(f"❌ Unknown color(s): {', '.join(unknown)}")
+        print(f"Available colors: {list(detector.color_rules.keys())}")
+        return
+
+    # Load image and analyze (shared by every requested color)
+    if not detector.load_image():
+        return
+
+    detector.analyze_unique_colors()
+
+    for color_name in colors:
+        emoji, hint = COLOR_DETAILS.get(color_name, ('🎨', None))
+        print(f"\n{emoji} {color_name.upper()} COLOR DETECTION")
+        print("=" * 50)
+
+        result = detector.analyze_color(color_name, downsample_factor=args.downsample)
+
+        if result['success']:
+            print(f"\n🎉 {color_name.title()} detection complete!")
+            print(f"📁 Results saved in: {args.output_dir}/")
+        else:
+            print(f"\n❌ No {color_name} colors found in the image.")
+            if hint:
+                print(f"💡 {hint}")
+
+if __name__ == "__main__":
+    main()
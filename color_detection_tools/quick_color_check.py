@@ -24,31 +24,24 @@ def main():
     # Create detector
     detector = UnifiedColorDetector(target_image)
     
-    # Load image and analyze
+    # Load image (no unique-color table needed, pixels are classified directly)
     if not detector.load_image():
         return
     
-    detector.analyze_unique_colors()
-    
-    # Quick check for each color
+    # Quick check for each color (large images are sampled, counts are estimates)
     colors_to_check = ['purple', 'blue', 'yellow', 'orange']
-    results = {}
-    
-    for color in colors_to_check:
-        detected_colors = detector.detect_color(color)
-        if detected_colors:
-            total_pixels = sum(count for _, count in detected_colors)
-            results[color] = total_pixels
-        else:
-            results[color] = 0
+    results, stride = detector.quick_check(colors_to_check)
     
     # Print summary
     print(f"\n📊 QUICK SUMMARY:")
+    if stride > 1:
+        print(f"(estimated from 1 in {stride} rows and columns)")
     print("-" * 30)
+    approx = "~" if stride > 1 else ""
     for color, count in results.items():
         if count > 0:
-            percentage = (count / (detector.rgb_image.shape[0] * detector.rgb_image.shape[1])) * 100
-            print(f"✅ {color.title()}: {count:,} pixels ({percentage:.2f}%)")
+            percentage = (count / detector.total_pixels) * 100
+            print(f"✅ {color.title()}: {approx}{count:,} pixels ({percentage:.2f}%)")
         else:
             print(f"❌ {color.title()}: No pixels found")
     
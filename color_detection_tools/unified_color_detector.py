@@ -1,10 +1,62 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from PIL import Image
 import os
-import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Bytes of RGB input classified per tile when working on raw pixels, so the
+# int16 channels and rule masks of a tile stay cache-resident
+TILE_BYTES = 256 * 1024
+
+# Images with at most this many distinct colors are counted by Pillow
+# (Image.getcolors) instead of sorting every pixel with np.unique
+PALETTE_COLOR_LIMIT = 1 << 16
+
+# Files at least this large are decoded with OpenCV when it is installed; its
+# decoder is faster, but below this size the extra import costs more than it saves
+OPENCV_DECODE_MIN_BYTES = 1 << 20
+
+def max3(r, g, b):
+    """Element-wise max of the three channel arrays."""
+    return np.maximum(np.maximum(r, g), b)
+
+def min3(r, g, b):
+    """Element-wise min of the three channel arrays."""
+    return np.minimum(np.minimum(r, g), b)
+
+def pack_rgb(rgb):
+    """Pack an (..., 3) RGB array into 0xRRGGBB uint32 keys."""
+    if isinstance(rgb, np.ndarray) and rgb.dtype == np.uint8:
+        # Lay the bytes out as B, G, R, 0 and reinterpret each pixel as a
+        # little-endian uint32; avoids widening every channel to uint32 first
+        # Channels are copied one at a time (contiguous destination strides)
+        # and only the pad byte is zeroed, so the buffer is written once
+        padded = np.empty(rgb.shape[:-1] + (4,), dtype=np.uint8)
+        padded[..., 0] = rgb[..., 2]
+        padded[..., 1] = rgb[..., 1]
+        padded[..., 2] = rgb[..., 0]
+        padded[..., 3] = 0
+        return padded.view('<u4')[..., 0].astype(np.uint32, copy=False)
+    rgb = np.asarray(rgb, dtype=np.uint32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+def write_json(path, data):
+    """Write data as indented JSON, using orjson when it is installed."""
+    # JSON modules are imported on first write so count-only runs skip them
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+    
+    if orjson is not None:
+        # Serialized in C, same layout as json.dump(indent=2)
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        import json
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
 class UnifiedColorDetector:
     def __init__(self, image_path, output_dir="color_analysis_results"):
         """
@@ -18,143 +70,179 @@ class UnifiedColorDetector:
         self.output_dir = output_dir
         self.image_array = None
         self.rgb_image = None
-        self.unique_colors = {}
-        self.sorted_colors = []
+        self.total_pixels = 0       # height * width of the loaded image
+        # Unique-color table as parallel arrays, most frequent first
+        self.unique_r = None        # (N,) uint8 red channel per unique color
+        self.unique_g = None        # (N,) uint8 green channel per unique color
+        self.unique_b = None        # (N,) uint8 blue channel per unique color
+        self.unique_counts = None   # (N,) pixel count per unique color
+        self.unique_keys = None     # (N,) packed 0xRRGGBB key per unique color
+        self.pixel_color_index = None  # (H, W) position in the table for every pixel
+        self.unique_class_bits = None  # (N,) bitmask of matching colors per unique color
+        self.pixel_class_bits = None   # (H, W) bitmask of matching colors per pixel
         
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
         
-        # Define color detection rules for each color
+        # Define color detection rules for each color.
+        # Each rule gets the r, g, b channels as int16 NumPy arrays (so sums and
+        # differences can't overflow) plus their element-wise max (mx) and min
+        # (mn), computed once and shared by every rule, and returns a boolean mask.
         self.color_rules = {
             'purple': {
                 'name': 'Purple',
                 'description': 'Colors with blue dominance, moderate red, and low green - distinct from fuchsia',
                 'rules': [
-                    lambda r, g, b: b > max(r, g) * 1.05,  # Blue is the dominant component (stricter than fuchsia)
-                    lambda r, g, b: g < min(r, b) * 0.5,   # Green much lower than red and blue
-                    lambda r, g, b: r > 20 and r < 180,    # Red present but not too bright (distinct from fuchsia)
-                    lambda r, g, b: b > 30 and b < 220,    # Blue present but not too bright
-                    lambda r, g, b: max(r, g, b) - min(r, g, b) > 20,  # Good color variation
-                    lambda r, g, b: b > r * 1.02,          # Blue slightly higher than red (purple characteristic)
-                    lambda r, g, b: int(r) + int(b) < 2 * int(g) + 250,  # Not as bright as fuchsia
-                    lambda r, g, b: abs(int(r) - int(b)) > 15,  # Red and blue should be different (not like fuchsia)
-                    lambda r, g, b: r < 200,               # Red not too bright (exclude bright fuchsia)
+                    lambda r, g, b, mx, mn: b > np.maximum(r, g) * 1.05,  # Blue is the dominant component (stricter than fuchsia)
+                    lambda r, g, b, mx, mn: g < np.minimum(r, b) * 0.5,   # Green much lower than red and blue
+                    lambda r, g, b, mx, mn: (r > 20) & (r < 180),  # Red present but not too bright (distinct from fuchsia)
+                    lambda r, g, b, mx, mn: (b > 30) & (b < 220),  # Blue present but not too bright
+                    lambda r, g, b, mx, mn: mx - mn > 20,  # Good color variation
+                    lambda r, g, b, mx, mn: b > r * 1.02,          # Blue slightly higher than red (purple characteristic)
+                    lambda r, g, b, mx, mn: r + b < 2 * g + 250,   # Not as bright as fuchsia
+                    lambda r, g, b, mx, mn: abs(r - b) > 15,       # Red and blue should be different (not like fuchsia)
+                    lambda r, g, b, mx, mn: r < 200,               # Red not too bright (exclude bright fuchsia)
                 ]
             },
             'blue': {
                 'name': 'Blue',
                 'description': 'Colors with dominant blue component',
                 'rules': [
-                    lambda r, g, b: b > max(r, g) * 1.2,   # Blue significantly dominant
-                    lambda r, g, b: max(r, g, b) - min(r, g, b) > 15,  # Color variation
-                    lambda r, g, b: b > 40,                # Blue present
+                    lambda r, g, b, mx, mn: b > np.maximum(r, g) * 1.2,  # Blue significantly dominant
+                    lambda r, g, b, mx, mn: mx - mn > 15,  # Color variation
+                    lambda r, g, b, mx, mn: b > 40,                # Blue present
                 ]
             },
             'yellow': {
                 'name': 'Yellow',
                 'description': 'Colors with similar high red and green values, controlled blue',
                 'rules': [
-                    lambda r, g, b: r > 120 and g > 120,   # Slightly higher minimum for R and G
-                    lambda r, g, b: abs(int(r) - int(g)) <= 60,    # R and G closer to each other
-                    lambda r, g, b: r > g * 0.85 and g > r * 0.85, # Tighten R/G balance to avoid orange
-                    lambda r, g, b: b < min(r, g) * 0.55,  # Lower blue proportion a bit
-                    lambda r, g, b: b < 140,               # Slightly lower absolute blue cap
-                    lambda r, g, b: max(r, g, b) - min(r, g, b) >= 28,  # Exclude near-white (low chroma)
-                    lambda r, g, b: int(r) + int(g) > 2 * int(b) + 60,  # Slightly stronger yellow space rule
+                    lambda r, g, b, mx, mn: (r > 120) & (g > 120),  # Slightly higher minimum for R and G
+                    lambda r, g, b, mx, mn: abs(r - g) <= 60,      # R and G closer to each other
+                    lambda r, g, b, mx, mn: (r > g * 0.85) & (g > r * 0.85),  # Tighten R/G balance to avoid orange
+                    lambda r, g, b, mx, mn: b < np.minimum(r, g) * 0.55,  # Lower blue proportion a bit
+                    lambda r, g, b, mx, mn: b < 140,               # Slightly lower absolute blue cap
+                    lambda r, g, b, mx, mn: mx - mn >= 28,  # Exclude near-white (low chroma)
+                    lambda r, g, b, mx, mn: r + g > 2 * b + 60,    # Slightly stronger yellow space rule
                 ]
             },
             'orange': {
                 'name': 'Orange',
                 'description': 'Colors with high red, medium green, low blue',
                 'rules': [
-                    lambda r, g, b: r > g and g > b,       # R > G > B
-                    lambda r, g, b: r > 80,                # High red
-                    lambda r, g, b: g > 30 and g < r * 0.8,  # Medium green
-                    lambda r, g, b: b < min(r, g) * 0.5,   # Low blue
-                    lambda r, g, b: max(r, g, b) - min(r, g, b) > 25,  # Color variation
+                    lambda r, g, b, mx, mn: (r > g) & (g > b),     # R > G > B
+                    lambda r, g, b, mx, mn: r > 80,                # High red
+                    lambda r, g, b, mx, mn: (g > 30) & (g < r * 0.8),  # Medium green
+                    lambda r, g, b, mx, mn: b < np.minimum(r, g) * 0.5,   # Low blue
+                    lambda r, g, b, mx, mn: mx - mn > 25,  # Color variation
                 ]
             },
             'red': {
                 'name': 'Red',
                 'description': 'Colors with dominant red component, excluding orange',
                 'rules': [
-                    lambda r, g, b: r > max(g, b) * 1.2,   # Red dominant but not as strict
-                    lambda r, g, b: r > 100,               # High red value
-                    lambda r, g, b: g < r * 0.6,           # Green much lower than red (stricter to avoid orange)
-                    lambda r, g, b: b < r * 0.6,           # Blue much lower than red
-                    lambda r, g, b: r - g > 50,            # Red significantly higher than green (avoid orange)
-                    lambda r, g, b: max(r, g, b) - min(r, g, b) > 40,  # Good color variation
+                    lambda r, g, b, mx, mn: r > np.maximum(g, b) * 1.2,  # Red dominant but not as strict
+                    lambda r, g, b, mx, mn: r > 100,               # High red value
+                    lambda r, g, b, mx, mn: g < r * 0.6,           # Green much lower than red (stricter to avoid orange)
+                    lambda r, g, b, mx, mn: b < r * 0.6,           # Blue much lower than red
+                    lambda r, g, b, mx, mn: r - g > 50,            # Red significantly higher than green (avoid orange)
+                    lambda r, g, b, mx, mn: mx - mn > 40,  # Good color variation
                 ]
             },
             'green': {
                 'name': 'Green',
                 'description': 'Colors with significant green component, including teal-green',
                 'rules': [
-                    lambda r, g, b: g > max(r, b),         # Green is highest component
-                    lambda r, g, b: g > 50,                # Minimum green value
-                    lambda r, g, b: g - max(r, b) > 10,    # Green noticeably higher (more lenient)
-                    lambda r, g, b: max(r, g, b) - min(r, g, b) > 15,  # Some color variation
-                    lambda r, g, b: g > 80 or (g > r * 1.5 and g > b * 0.8),  # Either bright green OR green dominant over red with reasonable blue
+                    lambda r, g, b, mx, mn: g > np.maximum(r, b),  # Green is highest component
+                    lambda r, g, b, mx, mn: g > 50,                # Minimum green value
+                    lambda r, g, b, mx, mn: g - np.maximum(r, b) > 10,  # Green noticeably higher (more lenient)
+                    lambda r, g, b, mx, mn: mx - mn > 15,  # Some color variation
+                    lambda r, g, b, mx, mn: (g > 80) | ((g > r * 1.5) & (g > b * 0.8)),  # Either bright green OR green dominant over red with reasonable blue
                 ]
             },
             'gray': {
                 'name': 'Gray',
                 'description': 'Colors with similar RGB values (neutral colors), excluding black and white',
                 'rules': [
-                    lambda r, g, b: abs(int(r) - int(g)) <= 15,  # Red and green are similar
-                    lambda r, g, b: abs(int(g) - int(b)) <= 15,  # Green and blue are similar
-                    lambda r, g, b: abs(int(r) - int(b)) <= 15,  # Red and blue are similar
-                    lambda r, g, b: max(r, g, b) - min(r, g, b) <= 20,  # Low color variation
-                    lambda r, g, b: min(r, g, b) >= 50,    # Exclude black colors (raised from 10 to 50)
-                    lambda r, g, b: max(r, g, b) <= 200,   # Not pure white (to avoid very bright whites)
-                    lambda r, g, b: max(r, g, b) >= 70,    # Ensure it's bright enough to be considered gray
+                    lambda r, g, b, mx, mn: abs(r - g) <= 15,  # Red and green are similar
+                    lambda r, g, b, mx, mn: abs(g - b) <= 15,  # Green and blue are similar
+                    lambda r, g, b, mx, mn: abs(r - b) <= 15,  # Red and blue are similar
+                    lambda r, g, b, mx, mn: mx - mn <= 20,  # Low color variation
+                    lambda r, g, b, mx, mn: mn >= 50,  # Exclude black colors (raised from 10 to 50)
+                    lambda r, g, b, mx, mn: mx <= 200,  # Not pure white (to avoid very bright whites)
+                    lambda r, g, b, mx, mn: mx >= 70,  # Ensure it's bright enough to be considered gray
                 ]
             },
             'fuchsia': {
                 'name': 'Fuchsia',
                 'description': 'Bright magenta/pink colors with high red and blue, low green',
                 'rules': [
-                    lambda r, g, b: r > 150 and b > 150,   # High red and blue
-                    lambda r, g, b: g < min(r, b) * 0.7,   # Green much lower than red and blue
-                    lambda r, g, b: abs(int(r) - int(b)) < 80,  # Red and blue should be reasonably similar
-                    lambda r, g, b: max(r, b) > g * 1.5,   # Either red or blue dominates over green
-                    lambda r, g, b: max(r, g, b) - min(r, g, b) > 40,  # Good color variation
-                    lambda r, g, b: int(r) + int(b) > 2 * int(g) + 100,   # Fuchsia color space rule
+                    lambda r, g, b, mx, mn: (r > 150) & (b > 150),  # High red and blue
+                    lambda r, g, b, mx, mn: g < np.minimum(r, b) * 0.7,  # Green much lower than red and blue
+                    lambda r, g, b, mx, mn: abs(r - b) < 80,  # Red and blue should be reasonably similar
+                    lambda r, g, b, mx, mn: np.maximum(r, b) > g * 1.5,  # Either red or blue dominates over green
+                    lambda r, g, b, mx, mn: mx - mn > 40,  # Good color variation
+                    lambda r, g, b, mx, mn: r + b > 2 * g + 100,   # Fuchsia color space rule
                 ]
             },
             'aqua': {
                 'name': 'Aqua',
                 'description': 'Cyan/aqua colors with high blue and green, low red - distinct from pure green',
                 'rules': [
-                    lambda r, g, b: b > 100 and g > 100,   # High blue and green components
-                    lambda r, g, b: r < min(b, g) * 0.6,   # Red significantly lower than blue and green
-                    lambda r, g, b: b >= g * 0.9,          # Blue should be at least 90% of green (allows blue to be slightly lower)
-                    lambda r, g, b: g >= b * 0.8,          # Green should be at least 80% of blue (allows green to be slightly lower)
-                    lambda r, g, b: g > r * 1.2,           # Green should be significantly higher than red
-                    lambda r, g, b: b > r * 1.2,           # Blue should be significantly higher than red
-                    lambda r, g, b: abs(int(b) - int(g)) < 80,  # Blue and green should be reasonably close
-                    lambda r, g, b: int(b) + int(g) > 2 * int(r) + 80,   # Aqua color space rule
-                    lambda r, g, b: max(b, g, r) - min(b, g, r) > 30,  # Good color variation
+                    lambda r, g, b, mx, mn: (b > 100) & (g > 100),  # High blue and green components
+                    lambda r, g, b, mx, mn: r < np.minimum(b, g) * 0.6,  # Red significantly lower than blue and green
+                    lambda r, g, b, mx, mn: b >= g * 0.9,          # Blue should be at least 90% of green (allows blue to be slightly lower)
+                    lambda r, g, b, mx, mn: g >= b * 0.8,          # Green should be at least 80% of blue (allows green to be slightly lower)
+                    lambda r, g, b, mx, mn: g > r * 1.2,           # Green should be significantly higher than red
+                    lambda r, g, b, mx, mn: b > r * 1.2,           # Blue should be significantly higher than red
+                    lambda r, g, b, mx, mn: abs(b - g) < 80,  # Blue and green should be reasonably close
+                    lambda r, g, b, mx, mn: b + g > 2 * r + 80,    # Aqua color space rule
+                    lambda r, g, b, mx, mn: mx - mn > 30,  # Good color variation
                 ]
             }
         }
+        
+        # One bit per color, used to look up all classifications at once
+        self.color_bits = {name: 1 << i for i, name in enumerate(self.color_rules)}
+    
+    def _decode_with_opencv(self):
+        """Decode a large 8-bit RGB/RGBA file with OpenCV, or return None to use Pillow."""
+        if os.path.getsize(self.image_path) < OPENCV_DECODE_MIN_BYTES:
+            return None
+        try:
+            import cv2
+        except ImportError:
+            return None
+        
+        image = cv2.imread(self.image_path, cv2.IMREAD_UNCHANGED)
+        if image is None or image.dtype != np.uint8 or image.ndim != 3:
+            return None
+        if image.shape[2] == 3:
+            return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        if image.shape[2] == 4:
+            return cv2.cvtColor(image, cv2.COLOR_BGRA2RGBA)
+        return None
     
     def load_image(self):
         """Load and prepare the image for analysis."""
         try:
-            pil_image = Image.open(self.image_path)
-            self.image_array = np.array(pil_image)
+            image_array = self._decode_with_opencv()
+            if image_array is None:
+                pil_image = Image.open(self.image_path)
+                if pil_image.mode not in ('RGB', 'RGBA'):
+                    pil_image = pil_image.convert('RGB')
+                
+                # np.asarray wraps the decoded buffer instead of copying it again
+                image_array = np.asarray(pil_image)
+            
+            # Keep it read-only since rgb_image below is a view into it
+            self.image_array = image_array
+            self.image_array.setflags(write=False)
             print(f"✅ Image loaded: {self.image_array.shape}")
             
-            # Convert to RGB
-            if len(self.image_array.shape) == 3:
-                if self.image_array.shape[2] == 4:  # RGBA
-                    self.rgb_image = self.image_array[:, :, :3]
-                else:  # RGB
-                    self.rgb_image = self.image_array
-            else:
-                print("❌ Unsupported image format")
-                return False
+            # Convert to RGB (drops alpha as a view, no copy)
+            self.rgb_image = self.image_array[:, :, :3]
+            self.total_pixels = self.rgb_image.shape[0] * self.rgb_image.shape[1]
             
             print(f"✅ RGB image shape: {self.rgb_image.shape}")
             return True
@@ -167,21 +255,182 @@ class UnifiedColorDetector:
         """Analyze and count unique colors in the image."""
         print("🔍 Analyzing unique colors...")
         
-        # Reshape to get all pixels
-        pixels = self.rgb_image.reshape(-1, 3)
-        print(f"📊 Total pixels: {len(pixels):,}")
+        print(f"📊 Total pixels: {self.total_pixels:,}")
+        
+        self.unique_keys, self.unique_counts, self.pixel_color_index = self._build_histogram()
+        self.unique_r = (self.unique_keys >> 16).astype(np.uint8)
+        self.unique_g = (self.unique_keys >> 8).astype(np.uint8)
+        self.unique_b = self.unique_keys.astype(np.uint8)
+        self.unique_class_bits = None
+        self.pixel_class_bits = None
+        
+        print(f"🎨 Unique colors found: {len(self.unique_counts):,}")
+        return len(self.unique_counts)
+    
+    def color_tuples(self, mask=None):
+        """Return the unique colors (optionally only those in mask) as ((r, g, b), count) tuples."""
+        r, g, b, counts = self.unique_r, self.unique_g, self.unique_b, self.unique_counts
+        if mask is not None:
+            r, g, b, counts = r[mask], g[mask], b[mask], counts[mask]
+        return list(zip(zip(r.tolist(), g.tolist(), b.tolist()), counts.tolist()))
+    
+    @property
+    def sorted_colors(self):
+        """All unique colors as ((r, g, b), count) tuples, most frequent first."""
+        if self.unique_counts is None:
+            return []
+        return self.color_tuples()
+    
+    @property
+    def unique_colors(self):
+        """Dict mapping each unique (r, g, b) tuple to its pixel count."""
+        return dict(self.sorted_colors)
+    
+    def _build_histogram(self):
+        """Return (unique_keys, counts, pixel_color_index) sorted by frequency."""
+        # Pack each pixel into a single 0xRRGGBB key
+        height, width = self.rgb_image.shape[:2]
+        packed = pack_rgb(self.rgb_image)
+        
+        # Count the keys in one pass
+        colors = Image.fromarray(self.rgb_image).getcolors(maxcolors=PALETTE_COLOR_LIMIT)
+        if colors is not None:
+            # Few distinct colors (typical for charts): Pillow counts them in C and
+            # each pixel's row is found by binary search over the small key table
+            keys = pack_rgb([rgb for _, rgb in colors])
+            key_order = np.argsort(keys)
+            unique_keys = keys[key_order]
+            counts = np.array([count for count, _ in colors], dtype=np.int64)[key_order]
+            inverse = np.searchsorted(unique_keys, packed)
+        else:
+            unique_keys, inverse, counts = np.unique(packed, return_inverse=True, return_counts=True)
+        
+        # Sort by frequency, remapping each pixel's index to the sorted order
+        order = np.argsort(-counts, kind='stable')
+        rank = np.empty(len(order), dtype=np.uint32)
+        rank[order] = np.arange(len(order))
+        pixel_color_index = rank[inverse].reshape(height, width)
+        unique_keys = unique_keys[order]
+        counts = counts[order]
+        
+        return unique_keys, counts, pixel_color_index
+    
+    def apply_rules(self, rules, r, g, b, mx=None, mn=None):
+        """
+        Return the mask of entries that pass every rule (r, g, b are int16 arrays).
+        
+        mx / mn are the channels' element-wise max / min; pass them in to share
+        them across several rule sets, otherwise they are computed here.
+        """
+        if mx is None:
+            mx = max3(r, g, b)
+        if mn is None:
+            mn = min3(r, g, b)
+        mask = np.ones(r.shape, dtype=bool)
+        for rule in rules:
+            mask &= rule(r, g, b, mx, mn)
+        return mask
+    
+    def classify_unique_colors(self):
+        """
+        Evaluate every color's rules once over the unique-color table.
+        
+        Returns:
+            np.ndarray: (N,) uint32 bitmask per unique color, see self.color_bits
+        """
+        if self.unique_class_bits is None:
+            r, g, b = (channel.astype(np.int16) for channel in (self.unique_r, self.unique_g, self.unique_b))
+            mx, mn = max3(r, g, b), min3(r, g, b)
+            class_bits = np.zeros(len(self.unique_counts), dtype=np.uint32)
+            for color_name, info in self.color_rules.items():
+                class_bits[self.apply_rules(info['rules'], r, g, b, mx, mn)] |= self.color_bits[color_name]
+            self.unique_class_bits = class_bits
+        return self.unique_class_bits
+    
+    def classify_all(self):
+        """
+        Classify every pixel for all colors in a single pass.
+        
+        Returns:
+            np.ndarray: (H, W) bitmask per pixel, see self.color_bits; a pixel
+            matching several colors has all their bits set
+        """
+        if self.pixel_class_bits is None:
+            # Narrowest unsigned type that holds every color bit
+            dtype = np.min_scalar_type(max(self.color_bits.values()) << 1)
+            class_bits = self.classify_unique_colors().astype(dtype)
+            self.pixel_class_bits = class_bits[self.pixel_color_index]
+        return self.pixel_class_bits
+    
+    def detect_color_mask(self, color_name):
+        """
+        Classify every pixel of the image for a specific color.
+        
+        Args:
+            color_name (str): Name of the color to detect
+        
+        Returns:
+            np.ndarray: (H, W) boolean mask of matching pixels, or None for an unknown color
+        """
+        if color_name not in self.color_rules:
+            print(f"❌ Unknown color: {color_name}")
+            print(f"Available colors: {list(self.color_rules.keys())}")
+            return None
+        
+        if self.pixel_color_index is not None:
+            # Read the color's bit out of the per-pixel classification
+            return (self.classify_all() & self.color_bits[color_name]) != 0
+        
+        # Classify band by band of rows rather than converting the whole image at once
+        rules = self.color_rules[color_name]['rules']
+        height, width = self.rgb_image.shape[:2]
+        tile_rows = max(1, TILE_BYTES // (width * 3))
+        mask = np.empty((height, width), dtype=bool)
+        
+        def classify_band(y):
+            # Split the tile into contiguous int16 r, g, b planes (unit-stride per channel)
+            r, g, b = np.moveaxis(self.rgb_image[y:y + tile_rows], -1, 0).astype(np.int16, order='C')
+            mask[y:y + tile_rows] = self.apply_rules(rules, r, g, b)
+        
+        band_starts = range(0, height, tile_rows)
+        workers = min(len(band_starts), os.cpu_count() or 1)
+        if workers > 1:
+            # Bands are independent and write disjoint rows of the mask; the
+            # NumPy work inside each one releases the GIL
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(classify_band, band_starts))
+        else:
+            for y in band_starts:
+                classify_band(y)
+        return mask
+    
+    def quick_check(self, color_names, max_pixels=200_000):
+        """
+        Estimate pixel counts for several colors from an evenly strided sample.
         
-        # Count unique colors efficiently
-        self.unique_colors = {}
-        for pixel in pixels:
-            pixel_tuple = tuple(pixel)
-            self.unique_colors[pixel_tuple] = self.unique_colors.get(pixel_tuple, 0) + 1
+        Images larger than max_pixels are sampled every `stride` rows and columns,
+        with stride chosen so roughly max_pixels remain; counts are scaled back up
+        to the full image. Smaller images are checked exactly.
         
-        # Sort by frequency
-        self.sorted_colors = sorted(self.unique_colors.items(), key=lambda x: x[1], reverse=True)
+        Args:
+            color_names (list): Names of the colors to check
+            max_pixels (int): Approximate number of pixels to classify
         
-        print(f"🎨 Unique colors found: {len(self.unique_colors):,}")
-        return self.sorted_colors
+        Returns:
+            tuple: ({color_name: estimated pixel count}, stride used)
+        """
+        stride = max(1, int(np.ceil(np.sqrt(self.total_pixels / max_pixels))))
+        
+        r, g, b = np.moveaxis(self.rgb_image[::stride, ::stride], -1, 0).astype(np.int16, order='C')
+        mx, mn = max3(r, g, b), min3(r, g, b)
+        scale = self.total_pixels / r.size
+        
+        counts = {}
+        for color_name in color_names:
+            matched = int(np.count_nonzero(self.apply_rules(self.color_rules[color_name]['rules'],
+                                                            r, g, b, mx, mn)))
+            counts[color_name] = int(round(matched * scale))
+        return counts, stride
     
     def detect_color(self, color_name):
         """
@@ -199,21 +448,19 @@ class UnifiedColorDetector:
             return []
         
         color_info = self.color_rules[color_name]
-        rules = color_info['rules']
         
         print(f"\n🎯 Detecting {color_info['name']} colors...")
         print(f"📝 {color_info['description']}")
         
-        detected_colors = []
-        total_pixels = sum(count for _, count in self.unique_colors.items())
+        total_pixels = self.total_pixels
+        
+        # All colors are classified together on first use
+        mask = (self.classify_unique_colors() & self.color_bits[color_name]) != 0
         
-        for (r, g, b), count in self.sorted_colors:
-            # Apply all rules
-            if all(rule(r, g, b) for rule in rules):
-                detected_colors.append(((r, g, b), count))
+        detected_colors = self.color_tuples(mask)
         
         if detected_colors:
-            total_detected = sum(count for _, count in detected_colors)
+            total_detected = int(self.unique_counts[mask].sum())
             percentage = (total_detected / total_pixels) * 100
             
             print(f"✅ Found {len(detected_colors)} {color_info['name'].lower()} color(s)")
@@ -229,60 +476,117 @@ class UnifiedColorDetector:
         
         return detected_colors
     
-    def create_visualization(self, color_name, detected_colors):
+    def create_visualization(self, color_name, detected_colors, downsample_factor=1, overlay_image=None):
         """
         Create visualization for detected colors.
         
         Args:
             color_name (str): Name of the detected color
             detected_colors (list): List of detected color tuples
+            downsample_factor (int): Keep every n-th row and column in the saved
+                image (statistics always come from the full-resolution pass)
+            overlay_image (np.ndarray): Highlighted image already rendered with
+                render_overlay() at the same step; rendered here if omitted
         """
         if not detected_colors:
             print(f"❌ No {color_name} colors to visualize")
             return None
         
-        # Create mask for detected colors
-        color_mask = np.zeros(self.rgb_image.shape[:2], dtype=bool)
-        detected_rgb_values = [rgb for (rgb, count) in detected_colors]
+        # Only the pixels that make it into the saved image are looked at
+        step = max(1, int(downsample_factor))
+        image = self.rgb_image[::step, ::step]
+        if overlay_image is None:
+            overlay_image = self.render_overlay(color_name, step=step)
         
-        # Create mask efficiently
-        for y in range(self.rgb_image.shape[0]):
-            for x in range(self.rgb_image.shape[1]):
-                pixel_rgb = tuple(self.rgb_image[y, x])
-                if pixel_rgb in detected_rgb_values:
-                    color_mask[y, x] = True
+        # Original image and highlighted copy side by side
+        visualization = Image.fromarray(np.hstack([image, overlay_image]))
         
-        # Create visualization
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 8))
-        
-        # Original image
-        ax1.imshow(self.rgb_image)
-        ax1.set_title('Original Image', fontsize=14, fontweight='bold')
-        ax1.axis('off')
-        
-        # Highlight detected colors
-        overlay_image = self.rgb_image.copy()
-        color_pixels = np.where(color_mask)
-        overlay_image[color_pixels] = [255, 255, 0]  # Bright yellow highlight
+        # Only needed when a visualization is actually written
+        from PIL import ImageDraw
         
         total_detected = sum(count for _, count in detected_colors)
-        ax2.imshow(overlay_image)
-        ax2.set_title(f'{color_name.title()} Colors Detected\n({total_detected:,} pixels)', 
-                     fontsize=14, fontweight='bold')
-        ax2.axis('off')
-        
-        plt.tight_layout()
+        draw = ImageDraw.Draw(visualization)
+        label_style = {'fill': (255, 255, 255), 'stroke_width': 2, 'stroke_fill': (0, 0, 0)}
+        draw.text((5, 5), 'Original Image', **label_style)
+        draw.text((image.shape[1] + 5, 5),
+                  f'{color_name.title()} Colors Detected\n({total_detected:,} pixels)', **label_style)
         
         # Save result
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_path = os.path.join(self.output_dir, f'{color_name}_detection_{timestamp}.png')
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
+        visualization.save(output_path)
         print(f"💾 Visualization saved to: {output_path}")
         
-        plt.show()
-        
         return output_path
     
+    def render_overlay(self, color_name, class_map=None, step=1):
+        """
+        Highlight one color's pixels in bright yellow.
+        
+        Args:
+            color_name (str): Name of the color to highlight
+            class_map (np.ndarray): Per-pixel class bitmask, e.g. read back from a
+                saved class map PNG; defaults to classify_all()
+            step (int): Keep every n-th row and column
+        
+        Returns:
+            np.ndarray: (H, W, 3) uint8 copy of the image with the color highlighted
+        """
+        if class_map is None:
+            class_map = self.classify_all()
+        color_mask = (class_map[::step, ::step] & self.color_bits[color_name]) != 0
+        
+        overlay_image = self.rgb_image[::step, ::step].copy()
+        overlay_image[color_mask] = [255, 255, 0]  # Bright yellow highlight
+        return overlay_image
+    
+    def save_class_map(self):
+        """
+        Save every color's classification as one image plus a single summary.
+        
+        The PNG stores the per-pixel class bitmask from classify_all() (see
+        color_bits in the summary); render_overlay() rebuilds a color's
+        highlighted view from it when needed.
+        
+        Returns:
+            tuple: (class map path, summary path)
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        map_path = os.path.join(self.output_dir, f'class_map_{timestamp}.png')
+        summary_path = os.path.join(self.output_dir, f'class_summary_{timestamp}.json')
+        
+        Image.fromarray(self.classify_all()).save(map_path)
+        
+        class_bits = self.classify_unique_colors()
+        colors = {}
+        for color_name, bit in self.color_bits.items():
+            pixel_count = int(self.unique_counts[(class_bits & bit) != 0].sum())
+            colors[color_name] = {
+                'pixel_count': pixel_count,
+                'percentage': pixel_count / self.total_pixels * 100
+            }
+        
+        summary = {
+            'analysis_info': {
+                'timestamp': timestamp,
+                'image_path': self.image_path,
+                'image_dimensions': [int(d) for d in self.image_array.shape],
+                'total_pixels': self.total_pixels,
+                'unique_colors': len(self.unique_counts)
+            },
+            'color_bits': self.color_bits,
+            'colors': colors,
+            'output_files': {
+                'class_map': map_path,
+                'summary': summary_path
+            }
+        }
+        write_json(summary_path, summary)
+        
+        print(f"🗺️  Class map saved to: {map_path}")
+        print(f"📄 Class summary saved to: {summary_path}")
+        return map_path, summary_path
+    
     def save_analysis_report(self, color_name, detected_colors, output_path):
         """
         Save detailed analysis report to JSON file.
@@ -295,16 +599,21 @@ class UnifiedColorDetector:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         report_path = os.path.join(self.output_dir, f'{color_name}_analysis_{timestamp}.json')
         
-        total_pixels = sum(count for _, count in self.unique_colors.items())
-        total_detected = sum(count for _, count in detected_colors)
+        total_pixels = self.total_pixels
+        
+        # Per-color values come out of NumPy as plain Python numbers in one go
+        rgb_values, counts = zip(*detected_colors)
+        counts = np.asarray(counts)
+        total_detected = int(counts.sum())
+        percentages = (counts / total_pixels * 100).tolist()
         
         report = {
             'analysis_info': {
                 'timestamp': timestamp,
                 'image_path': self.image_path,
                 'image_dimensions': [int(d) for d in self.image_array.shape],
-                'total_pixels': int(total_pixels),
-                'unique_colors': int(len(self.unique_colors))
+                'total_pixels': total_pixels,
+                'unique_colors': len(self.unique_counts)
             },
             'color_detection': {
                 'color_name': color_name,
@@ -318,11 +627,11 @@ class UnifiedColorDetector:
             },
             'detected_colors': [
                 {
-                    'rgb': [int(c) for c in rgb],
-                    'pixel_count': int(count),
-                    'percentage': float((count / total_pixels) * 100)
+                    'rgb': list(rgb),
+                    'pixel_count': count,
+                    'percentage': percentage
                 }
-                for rgb, count in detected_colors
+                for rgb, count, percentage in zip(rgb_values, counts.tolist(), percentages)
             ],
             'output_files': {
                 'visualization': output_path,
@@ -330,18 +639,20 @@ class UnifiedColorDetector:
             }
         }
         
-        with open(report_path, 'w') as f:
-            json.dump(report, f, indent=2)
+        write_json(report_path, report)
         
         print(f"📄 Analysis report saved to: {report_path}")
         return report_path
     
-    def analyze_color(self, color_name):
+    def analyze_color(self, color_name, downsample_factor=1, overlay_image=None):
         """
         Complete analysis for a specific color.
         
         Args:
             color_name (str): Name of the color to analyze
+            downsample_factor (int): Downsampling of the saved visualization,
+                see create_visualization
+            overlay_image (np.ndarray): Pre-rendered highlight, see create_visualization
         
         Returns:
             dict: Analysis results
@@ -355,7 +666,8 @@ class UnifiedColorDetector:
         
         if detected_colors:
             # Create visualization
-            output_path = self.create_visualization(color_name, detected_colors)
+            output_path = self.create_visualization(color_name, detected_colors, downsample_factor,
+                                                    overlay_image=overlay_image)
             
             # Save report
             report_path = self.save_analysis_report(color_name, detected_colors, output_path)
@@ -376,10 +688,16 @@ class UnifiedColorDetector:
                 'success': False
             }
     
-    def analyze_all_colors(self):
+    def analyze_all_colors(self, per_color_outputs=True, downsample_factor=1):
         """
         Analyze all supported colors in the image.
         
+        Args:
+            per_color_outputs (bool): Write a visualization and report per color;
+                if False, write a single class map and summary instead
+            downsample_factor (int): Keep every n-th row and column in the
+                per-color visualizations, see create_visualization
+        
         Returns:
             dict: Results for all colors
         """
@@ -393,10 +711,50 @@ class UnifiedColorDetector:
         
         self.analyze_unique_colors()
         
-        # Analyze each color
-        results = {}
-        for color_name in self.color_rules.keys():
-            results[color_name] = self.analyze_color(color_name)
+        # Classify every pixel once up front; the workers below only read it
+        self.classify_all()
+        
+        color_names = list(self.color_rules)
+        if per_color_outputs:
+            # Render the highlighted images concurrently (the NumPy masking releases
+            # the GIL), then report and save each color in order so the console
+            # output of different colors doesn't interleave. Only `workers` renders
+            # run ahead of the color being saved, so at most that many full-size
+            # overlays are held at once
+            step = max(1, int(downsample_factor))
+            class_bits = self.classify_unique_colors()
+            found = iter([name for name in color_names if (class_bits & self.color_bits[name]).any()])
+            workers = os.cpu_count() or 1
+            results = {}
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = {}
+                
+                def render_next():
+                    name = next(found, None)
+                    if name is not None:
+                        pending[name] = executor.submit(self.render_overlay, name, step=step)
+                
+                for _ in range(workers):
+                    render_next()
+                for color_name in color_names:
+                    future = pending.pop(color_name, None)
+                    overlay_image = None
+                    if future is not None:
+                        overlay_image = future.result()
+                        render_next()
+                    results[color_name] = self.analyze_color(color_name, step, overlay_image=overlay_image)
+        else:
+            map_path, summary_path = self.save_class_map()
+            results = {}
+            for color_name in color_names:
+                detected_colors = self.detect_color(color_name)
+                results[color_name] = {
+                    'color_name': color_name,
+                    'detected_colors': detected_colors,
+                    'visualization_path': map_path if detected_colors else None,
+                    'report_path': summary_path if detected_colors else None,
+                    'success': bool(detected_colors)
+                }
         
         # Print summary
         print(f"\n{'='*60}")
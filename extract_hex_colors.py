@@ -3,7 +3,53 @@ import numpy as np
 import matplotlib.pyplot as plt
 from PIL import Image
 import os
-from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from color_detection_tools.unified_color_detector import pack_rgb
+
+# Above this many pixels colors are counted with np.bincount over all 2^24
+# possible keys (one linear pass, 128 MB of int64 bins) instead of sorting them
+BINCOUNT_MIN_PIXELS = 1 << 22
+
+# Threads for that bincount (np.bincount releases the GIL). Each thread counts
+# its own slice of the key range, so the bins add up to 128 MB however many
+# threads run
+HISTOGRAM_THREADS = min(4, os.cpu_count() or 1)
+
+# Two-digit uppercase hex for every byte value, indexed by channel value
+_HEX_LUT = np.array([f"{i:02X}" for i in range(256)], dtype='<U2')
+
+def keys_to_hex(keys):
+    """Format packed 0xRRGGBB integers as '#RRGGBB' strings using the byte lookup table."""
+    keys = np.asarray(keys, dtype=np.uint32)
+    hex_codes = np.char.add('#', _HEX_LUT[keys >> 16])
+    hex_codes = np.char.add(hex_codes, _HEX_LUT[(keys >> 8) & 0xFF])
+    hex_codes = np.char.add(hex_codes, _HEX_LUT[keys & 0xFF])
+    return hex_codes.tolist()
+
+def count_keys(keys):
+    """
+    Count every 24-bit key with np.bincount.
+    
+    Returns (unique_keys, counts) in ascending key order. Each thread bins the
+    keys of one slice of the key range and keeps only its nonzero bins.
+    """
+    bounds = [(i << 24) // HISTOGRAM_THREADS for i in range(HISTOGRAM_THREADS + 1)]
+    
+    def count_range(lo, hi):
+        if HISTOGRAM_THREADS > 1:
+            in_range = keys >= lo
+            in_range &= keys < hi
+            part = keys[in_range] - np.uint32(lo)
+        else:
+            part = keys
+        bins = np.bincount(part, minlength=hi - lo)
+        present = np.flatnonzero(bins)
+        return present + lo, bins[present]
+    
+    with ThreadPoolExecutor(max_workers=HISTOGRAM_THREADS) as executor:
+        parts = list(executor.map(count_range, bounds[:-1], bounds[1:]))
+    return np.concatenate([k for k, _ in parts]), np.concatenate([c for _, c in parts])
 
 class HexColorExtractor:
     def __init__(self, image_path):
@@ -17,13 +63,25 @@ class HexColorExtractor:
         self.image_array = None
         self.unique_colors = []
         self.color_counts = {}
+        self.color_rgb = None  # (N, 3) uint8 channels of unique_colors, same order
+        self.total_pixels = 0
         
     def load_image(self):
         """Load the image."""
         try:
-            # Load with PIL
-            self.pil_image = Image.open(self.image_path)
-            self.image_array = np.array(self.pil_image)
+            # Decode straight to a NumPy array with OpenCV, swapping BGR(A) to RGB(A)
+            image = cv2.imread(self.image_path, cv2.IMREAD_UNCHANGED)
+            if image is not None and image.dtype == np.uint8 and image.ndim == 3 and image.shape[2] == 3:
+                self.image_array = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            elif image is not None and image.dtype == np.uint8 and image.ndim == 3 and image.shape[2] == 4:
+                self.image_array = cv2.cvtColor(image, cv2.COLOR_BGRA2RGBA)
+            else:
+                # Grayscale, 16-bit or formats OpenCV can't read: load with PIL,
+                # expanding palette and other modes so pixels hold real colors
+                pil_image = Image.open(self.image_path)
+                if pil_image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+                    pil_image = pil_image.convert('RGB')
+                self.image_array = np.asarray(pil_image)
             
             print(f"Image loaded successfully: {self.image_array.shape}")
             print(f"Image type: {self.image_array.dtype}")
@@ -35,42 +93,62 @@ class HexColorExtractor:
             print(f"Error loading image: {e}")
             return False
     
-    def extract_hex_colors(self):
+    def extract_hex_colors(self, max_pixels=None):
         """
         Extract all unique hex color codes from the image.
+        
+        Args:
+            max_pixels (int): If set and the image is larger, count an evenly strided
+                sample of about this many pixels and scale the counts back up to
+                estimates for the full image (enough to rank the dominant colors)
         """
         if self.image_array is None:
             print("Image not loaded")
             return []
         
-        # Handle different image formats
-        if len(self.image_array.shape) == 3:
-            if self.image_array.shape[2] == 4:  # RGBA
-                # Convert RGBA to RGB (ignore alpha channel)
-                image_rgb = self.image_array[:, :, :3]
-            else:  # RGB
-                image_rgb = self.image_array
+        # One path for every layout, all as (H, W, 3) views: alpha is dropped
+        # and a gray channel is broadcast to R = G = B without copying it
+        image = np.atleast_3d(self.image_array)
+        if image.shape[2] < 3:
+            image_rgb = np.broadcast_to(image[:, :, :1], image.shape[:2] + (3,))
         else:
-            print("Unsupported image format")
-            return []
-        
-        # Reshape the image to a list of pixels
-        pixels = image_rgb.reshape(-1, 3)
+            image_rgb = image[:, :, :3]
+        
+        # Pack each pixel into a single 0xRRGGBB integer and count them in C.
+        # pack_rgb reads the channels straight from the (possibly strided RGBA)
+        # view and writes 4 bytes per pixel, with no uint32 temporaries
+        self.total_pixels = image_rgb.shape[0] * image_rgb.shape[1]
+        stride = 1
+        if max_pixels and self.total_pixels > max_pixels:
+            stride = int(np.ceil(np.sqrt(self.total_pixels / max_pixels)))
+            image_rgb = image_rgb[::stride, ::stride]
+        keys = pack_rgb(image_rgb).ravel()
+        if keys.size >= BINCOUNT_MIN_PIXELS:
+            unique_keys, counts = count_keys(keys)
+            # Equal counts are ranked by color value (the keys come out ascending);
+            # finding each color's first pixel would take another per-pixel pass
+            tie_order = unique_keys
+        else:
+            unique_keys, tie_order, counts = np.unique(keys, return_index=True, return_counts=True)
         
-        # Convert to hex colors
-        hex_colors = []
-        for pixel in pixels:
-            r, g, b = pixel
-            hex_color = f"#{r:02x}{g:02x}{b:02x}".upper()
-            hex_colors.append(hex_color)
+        if stride > 1:
+            counts = np.rint(counts * (self.total_pixels / keys.size)).astype(np.int64)
         
-        # Count occurrences of each color
-        self.color_counts = Counter(hex_colors)
+        # Most frequent first; on small images ties keep the order the colors
+        # first appear in, on large ones they go by color value (see above)
+        order = np.lexsort((tie_order, -counts))
         
-        # Get unique colors sorted by frequency
-        self.unique_colors = sorted(self.color_counts.items(), key=lambda x: x[1], reverse=True)
+        # Only the unique colors get formatted as hex strings; keep their
+        # channels as integers too so nothing has to parse the hex back
+        sorted_keys = unique_keys[order]
+        hex_colors = keys_to_hex(sorted_keys)
+        self.color_rgb = np.stack([sorted_keys >> 16, sorted_keys >> 8, sorted_keys], axis=1).astype(np.uint8)
+        self.unique_colors = list(zip(hex_colors, counts[order].tolist()))
+        self.color_counts = dict(self.unique_colors)
         
         print(f"Found {len(self.unique_colors)} unique colors in the image")
+        if stride > 1:
+            print(f"(estimated from 1 in {stride} rows and columns)")
         return self.unique_colors
     
     def display_hex_colors(self, top_n=20):
@@ -91,10 +169,9 @@ class HexColorExtractor:
         print(f"Showing top {min(top_n, len(self.unique_colors))} most frequent colors:")
         print(f"{'='*60}")
         
-        for i, (hex_color, count) in enumerate(self.unique_colors[:top_n]):
-            # Convert hex to RGB for display
-            rgb = tuple(int(hex_color[i:i+2], 16) for i in (1, 3, 5))
-            percentage = (count / sum(self.color_counts.values())) * 100
+        top_rgb = self.color_rgb[:top_n].tolist()
+        for i, ((hex_color, count), rgb) in enumerate(zip(self.unique_colors[:top_n], top_rgb)):
+            percentage = (count / self.total_pixels) * 100
             
             print(f"{i+1:2d}. {hex_color} | RGB({rgb[0]:3d}, {rgb[1]:3d}, {rgb[2]:3d}) | Count: {count:6d} ({percentage:5.2f}%)")
         
@@ -111,16 +188,14 @@ class HexColorExtractor:
             print("No colors extracted yet. Run extract_hex_colors() first.")
             return []
         
-        red_colors = []
+        # Check every color at once: red component is significantly higher than green and blue
+        r, g, b = self.color_rgb.T
+        red_mask = (r > g) & (r > b) & (r > 100)  # Red is dominant and bright enough
         
-        for hex_color, count in self.unique_colors:
-            # Convert hex to RGB
-            rgb = tuple(int(hex_color[i:i+2], 16) for i in (1, 3, 5))
-            r, g, b = rgb
-            
-            # Check if this is a red color (red component is significantly higher than green and blue)
-            if r > g and r > b and r > 100:  # Red is dominant and bright enough
-                red_colors.append((hex_color, rgb, count))
+        red_colors = [
+            (self.unique_colors[i][0], tuple(rgb), self.unique_colors[i][1])
+            for i, rgb in zip(np.flatnonzero(red_mask).tolist(), self.color_rgb[red_mask].tolist())
+        ]
         
         print(f"\n{'='*60}")
         print(f"RED COLORS FOUND")
@@ -128,7 +203,7 @@ class HexColorExtractor:
         
         if red_colors:
             for i, (hex_color, rgb, count) in enumerate(red_colors):
-                percentage = (count / sum(self.color_counts.values())) * 100
+                percentage = (count / self.total_pixels) * 100
                 print(f"{i+1:2d}. {hex_color} | RGB({rgb[0]:3d}, {rgb[1]:3d}, {rgb[2]:3d}) | Count: {count:6d} ({percentage:5.2f}%)")
         else:
             print("No predominantly red colors found.")
@@ -136,9 +211,14 @@ class HexColorExtractor:
         print(f"{'='*60}")
         return red_colors
     
-    def create_color_palette(self, top_n=20):
+    def create_color_palette(self, top_n=20, show=False):
         """
         Create a visual color palette of the most frequent colors.
+        
+        Args:
+            top_n (int): Number of top colors to include
+            show (bool): Also open the palette in a matplotlib window; by default
+                it is only saved, which skips GUI start-up in batch runs
         """
         if not self.unique_colors:
             print("No colors extracted yet. Run extract_hex_colors() first.")
@@ -154,17 +234,20 @@ class HexColorExtractor:
         bar_height = 1
         y_positions = np.arange(len(top_colors))
         
+        # Matplotlib colors as 0-1 floats, straight from the stored channels
+        normalized_colors = self.color_rgb[:top_n] / 255
+        counts = np.array([count for _, count in top_colors])
+        
+        # Create all color bars in one call
+        ax.barh(y_positions, counts, height=bar_height, color=normalized_colors, edgecolor='black', linewidth=0.5)
+        
+        # Labels sit just past the longest bar
+        label_offset = counts.max() * 0.01
+        
         for i, (hex_color, count) in enumerate(top_colors):
-            # Convert hex to RGB for matplotlib
-            rgb = tuple(int(hex_color[i:i+2], 16) for i in (1, 3, 5))
-            normalized_rgb = (rgb[0]/255, rgb[1]/255, rgb[2]/255)
-            
-            # Create color bar
-            ax.barh(i, count, height=bar_height, color=normalized_rgb, edgecolor='black', linewidth=0.5)
-            
             # Add text labels
-            percentage = (count / sum(self.color_counts.values())) * 100
-            ax.text(count + max([c[1] for c in top_colors]) * 0.01, i, 
+            percentage = (count / self.total_pixels) * 100
+            ax.text(count + label_offset, i, 
                    f"{hex_color} ({percentage:.1f}%)", 
                    va='center', fontsize=8)
         
@@ -181,12 +264,19 @@ class HexColorExtractor:
         plt.savefig(output_path, dpi=300, bbox_inches='tight')
         print(f"Color palette saved to: {output_path}")
         
-        plt.show()
+        if show:
+            plt.show()
+        # Free the figure so repeated runs don't accumulate them
+        plt.close(fig)
         return output_path
     
-    def analyze_image_colors(self):
+    def analyze_image_colors(self, max_pixels=None):
         """
         Main method to perform complete color analysis.
+        
+        Args:
+            max_pixels (int): Sample large images down to about this many pixels
+                (see extract_hex_colors); None counts every pixel
         """
         print("Starting hex color extraction...")
         print(f"Target image: {self.image_path}")
@@ -196,7 +286,7 @@ class HexColorExtractor:
             return False
         
         # Extract hex colors
-        self.extract_hex_colors()
+        self.extract_hex_colors(max_pixels=max_pixels)
         
         # Display results
         self.display_hex_colors(top_n=30)
@@ -3,42 +3,133 @@ from ibapi.wrapper import EWrapper
 from ibapi.contract import Contract
 from ibapi.common import BarData
 import threading
-import time
 import datetime
+import logging
+from collections import deque
 
+logger = logging.getLogger(__name__)
+
+RECENT_BARS = 20  # bars used for the recent high / low
+
+# Default confidences (can be wired to your model later); the Fibonacci
+# SL/TP multipliers only depend on them, so they are computed once here
+CONFIDENCE_BULL = 0.5
+CONFIDENCE_BEAR = 0.5
+FIB_SL_LONG = 0.382 + (1 - CONFIDENCE_BULL) * (0.618 - 0.382)
+FIB_TP_LONG = 1.382 + CONFIDENCE_BULL * (1.618 - 1.382)
+FIB_SL_SHORT = 0.382 + (1 - CONFIDENCE_BEAR) * (0.618 - 0.382)
+FIB_TP_SHORT = 1.382 + CONFIDENCE_BEAR * (1.618 - 1.382)
+
+class HistoricalRequest:
+    """Running summary of one historical data request's bars."""
+    # One of these is created per request, so skip the per-instance __dict__
+    __slots__ = ('recent', 'bar_count', 'last_close')
+
+    def __init__(self):
+        self.recent = deque(maxlen=RECENT_BARS)  # (high, low) of the latest bars
+        self.bar_count = 0
+        self.last_close = None
+
+# No __slots__ here: EClient / EWrapper don't declare any and EClient.__init__
+# sets its own attributes, so every instance has a __dict__ regardless
 class IBApp(EWrapper, EClient):
     def __init__(self):
         EClient.__init__(self, self)
-        self.data = []  # to store bars
-        self.done = False
+        self.ready_event = threading.Event()  # set by nextValidId once connected
+        self._lock = threading.Lock()
+        self._req_id = 0
+        # Historical data buffers and events keyed by reqId, so several
+        # requests can share the connection
+        self._hist_data = {}
+        self._hist_events = {}
+
+    def nextValidId(self, orderId: int):
+        self.ready_event.set()
+
+    def start_request(self):
+        """Allocate a reqId with an empty bar buffer; returns (reqId, completion event)."""
+        with self._lock:
+            self._req_id += 1
+            req_id = self._req_id
+        self._hist_data[req_id] = HistoricalRequest()
+        ev = threading.Event()
+        self._hist_events[req_id] = ev
+        return req_id, ev
+
+    def finish_request(self, req_id: int):
+        """Drop a request's buffers and return its bar summary."""
+        self._hist_events.pop(req_id, None)
+        return self._hist_data.pop(req_id, None)
 
     def historicalData(self, reqId: int, bar: BarData):
-        print(f"HistoricalData. ReqId: {reqId}, Date: {bar.date}, Open: {bar.open}, High: {bar.high}, "
-              f"Low: {bar.low}, Close: {bar.close}, Volume: {bar.volume}")
-        self.data.append(bar)
+        # Runs on the API reader thread once per bar: debug level with lazy
+        # %-formatting, so nothing is formatted or written unless enabled
+        logger.debug("HistoricalData. ReqId: %s, Date: %s, Open: %s, High: %s, Low: %s, Close: %s, Volume: %s",
+                     reqId, bar.date, bar.open, bar.high, bar.low, bar.close, bar.volume)
+        data = self._hist_data.get(reqId)
+        if data is None:
+            return
+        data.recent.append((float(bar.high), float(bar.low)))
+        data.bar_count += 1
+        data.last_close = float(bar.close)
 
     def historicalDataEnd(self, reqId: int, start: str, end: str):
-        print(f"HistoricalDataEnd. ReqId: {reqId}, from {start} to {end}")
-        self.done = True
+        logger.debug("HistoricalDataEnd. ReqId: %s, from %s to %s", reqId, start, end)
+        ev = self._hist_events.get(reqId)
+        if ev is not None:
+            ev.set()
 
 def run_loop(app):
     app.run()
 
+# One TWS / Gateway connection shared by every get_sl_tp call
+_app = None
+_app_lock = threading.Lock()
+
+def get_app():
+    """Return the shared IBApp, connecting on first use or after the connection drops."""
+    global _app
+    with _app_lock:
+        if _app is not None and _app.isConnected():
+            return _app
+
+        app = IBApp()
+        # connect to TWS / Gateway
+        app.connect("127.0.0.1", 4002, clientId=110)
+
+        # Start the socket in a thread
+        api_thread = threading.Thread(target=run_loop, args=(app,), daemon=True)
+        api_thread.start()
+
+        # Wait for nextValidId which signals the connection is ready
+        if not app.ready_event.wait(timeout=5):
+            app.disconnect()
+            raise RuntimeError("Timed out waiting for nextValidId from TWS/Gateway")
+
+        _app = app
+        return _app
+
+def close_app():
+    """Disconnect the shared IBApp, if one is open."""
+    global _app
+    with _app_lock:
+        if _app is not None:
+            _app.disconnect()
+            _app = None
+
 def get_sl_tp(symbol: str, signal_type: str):
     """Fetch 5-minute historical bars for the past 1 day for a given stock symbol,
     compute last-20-bar recent low/high on closes, then compute SL/TP based on signal_type.
+    The TWS connection is opened on the first call and reused afterwards (see close_app).
 
     Returns a tuple: (SL, TP)
     """
-    app = IBApp()
-    # connect to TWS / Gateway
-    app.connect("127.0.0.1", 4002, clientId=110)
+    if signal_type.lower() not in ("buy", "sell"):
+        raise ValueError("signal_type must be 'buy' or 'sell'")
 
-    # Start the socket in a thread
-    api_thread = threading.Thread(target=run_loop, args=(app,), daemon=True)
-    api_thread.start()
+    app = get_app()
+    req_id, done_event = app.start_request()
 
-    time.sleep(0.01)
     # Define the contract
     contract = Contract()
     contract.symbol = symbol
@@ -54,7 +145,7 @@ def get_sl_tp(symbol: str, signal_type: str):
     # whatToShow: e.g. "TRADES"
     # formatDate: 1 or 2 (affects date format)
     app.reqHistoricalData(
-        reqId=1,
+        reqId=req_id,
         contract=contract,
         endDateTime=end_time,
         durationStr="1 D",
@@ -67,54 +158,40 @@ def get_sl_tp(symbol: str, signal_type: str):
     )
 
     # Wait until data is received via historicalData + historicalDataEnd
-    while not app.done:
-        time.sleep(0.01)
+    finished = done_event.wait(timeout=30)
+    data = app.finish_request(req_id)
+    if not finished:
+        raise RuntimeError("Timed out waiting for historical bars")
 
-    # Now app.data has the bars
-    num_bars = len(app.data)
+    # Now data.recent holds the last bars
+    num_bars = data.bar_count
     print(f"Received {num_bars} bars for {symbol}")
 
     if num_bars == 0:
-        app.disconnect()
         raise RuntimeError("No historical bars received")
 
-    # Take last 20 bars (or fewer if not enough)
-    last_bars = app.data[-20:] if num_bars >= 20 else app.data[:]
-    highs = [float(b.high) for b in last_bars]
-    lows = [float(b.low) for b in last_bars]
-    recent_low = min(lows)
-    recent_high = max(highs)
+    # Last 20 bars (or fewer if not enough), already kept by the deque
+    recent_high = max(high for high, _ in data.recent)
+    recent_low = min(low for _, low in data.recent)
     # Dummy current price provider
     def get_current_price(sym: str) -> float:
         # For now, use the last bar close as a proxy for current price
-        return float(app.data[-1].close)
+        return data.last_close
 
     current_price = get_current_price(symbol)
 
-    # Default confidences (can be wired to your model later)
-    confidence_bull = 0.5
-    confidence_bear = 0.5
-
     if signal_type.lower() == "buy":
         risk_long = current_price - recent_low
         if risk_long == 0:
             risk_long = recent_high - recent_low
-        fib_sl_long = 0.382 + (1 - confidence_bull) * (0.618 - 0.382)
-        fib_tp_long = 1.382 + confidence_bull * (1.618 - 1.382)
-        sl = current_price - risk_long * fib_sl_long
-        tp = current_price + risk_long * fib_tp_long
-    elif signal_type.lower() == "sell":
+        sl = current_price - risk_long * FIB_SL_LONG
+        tp = current_price + risk_long * FIB_TP_LONG
+    else:
         risk_short = recent_high - current_price
         if risk_short == 0:
             risk_short = recent_high - recent_low
-        fib_sl_short = 0.382 + (1 - confidence_bear) * (0.618 - 0.382)
-        fib_tp_short = 1.382 + confidence_bear * (1.618 - 1.382)
-        sl = current_price + risk_short * fib_sl_short
-        tp = current_price - risk_short * fib_tp_short
-    else:
-        app.disconnect()
-        raise ValueError("signal_type must be 'buy' or 'sell'")
-    app.disconnect()
+        sl = current_price + risk_short * FIB_SL_SHORT
+        tp = current_price - risk_short * FIB_TP_SHORT
     return tp, sl
 
 def main():
@@ -123,6 +200,7 @@ def main():
     # print("BUY -> SL:", _sl, "TP:", _tp)
     _sl, _tp = get_sl_tp("TSLA", "sell")
     print("SELL -> SL:", _sl, "TP:", _tp)
+    close_app()
 
 if __name__ == "__main__":
     main()
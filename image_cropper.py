@@ -1,6 +1,25 @@
+import cv2
+import numpy as np
 from PIL import Image
 import os
 
+def crop_region(img, x, y, width, height):
+    """
+    Cut a (width x height) region at (x, y) out of an image array.
+    
+    Like PIL's Image.crop, any part of the region outside the image is
+    filled with zeros; a region fully inside is returned as a view.
+    """
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + width, img.shape[1]), min(y + height, img.shape[0])
+    if (x0, y0, x1, y1) == (x, y, x + width, y + height):
+        return img[y:y1, x:x1]
+    
+    crop = np.zeros((height, width) + img.shape[2:], dtype=img.dtype)
+    if x1 > x0 and y1 > y0:
+        crop[y0 - y:y1 - y, x0 - x:x1 - x] = img[y0:y1, x0:x1]
+    return crop
+
 def crop_image(image_path, output_dir="cropped_images"):
     """
     Crop specific regions from an image with hardcoded coordinates.
@@ -11,68 +30,43 @@ def crop_image(image_path, output_dir="cropped_images"):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     
-    # Load the image
-    try:
-        img = Image.open(image_path)
-        # print(f"Original image size: {img.size} (width x height)")
-    except Exception as e:
-        print(f"Error loading image: {e}")
+    # Load the image (decoded once; crops below are slices of this array)
+    img = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
+    if img is None:
+        print(f"Error loading image: could not read {image_path}")
         return
+    # print(f"Original image size: {img.shape[1]}x{img.shape[0]} (width x height)")
     
-    # CROP 1: Small top left corner
-    # Adjust these coordinates as needed
-    top_left_x = 160          # Starting x position (left edge)
-    top_left_y = 0         # Starting y position (top edge)
-    top_left_width = 140  # Width of the crop
-    top_left_height = 60   # Height of the crop
-    
-    # CROP 2: Vertical long rectangle in the middle-right area
-    # Adjust these coordinates as needed
-    vertical_x = 2500        # Starting x position (from left)
-    vertical_y = 80         # Starting y position (from top)
-    vertical_width = 250    # Width of the vertical rectangle
-    vertical_height = 1430   # Height of the vertical rectangle
+    # Crop regions: (name, output file, x, y, width, height)
+    # Adjust these coordinates as needed; add entries for more crops
+    regions = [
+        # CROP 1: Small top left corner
+        ("Top Left Corner", "top_left_corner.png", 160, 0, 140, 60),
+        # CROP 2: Vertical long rectangle in the middle-right area
+        ("Vertical Rectangle", "vertical_rectangle.png", 2500, 80, 250, 1430),
+    ]
     
-    # Perform the crops
+    # Perform the crops; each one is a view of the decoded image (padded only
+    # where it runs past the edge), so only the encode is work
     crops = []
-    
-    # Crop 1: Top left corner
-    try:
-        top_left_crop = img.crop((
-            top_left_x, 
-            top_left_y, 
-            top_left_x + top_left_width, 
-            top_left_y + top_left_height
-        ))
-        
-        top_left_path = os.path.join(output_dir, "top_left_corner.png")
-        top_left_crop.save(top_left_path)
-        crops.append(("Top Left Corner", top_left_path, top_left_crop.size))
-        # print(f"✓ Top left corner saved: {top_left_path}")
-        # print(f"  Crop area: ({top_left_x}, {top_left_y}) to ({top_left_x + top_left_width}, {top_left_y + top_left_height})")
-        
-    except Exception as e:
-        print(f"Error cropping top left: {e}")
-    
-    # Crop 2: Vertical rectangle
-    try:
-        vertical_crop = img.crop((
-            vertical_x, 
-            vertical_y, 
-            vertical_x + vertical_width, 
-            vertical_y + vertical_height
-        ))
-        
-        vertical_path = os.path.join(output_dir, "vertical_rectangle.png")
-        vertical_crop.save(vertical_path)
-        crops.append(("Vertical Rectangle", vertical_path, vertical_crop.size))
-        
-    except Exception as e:
-        print(f"Error cropping vertical rectangle: {e}")
+    for name, filename, x, y, width, height in regions:
+        try:
+            crop = crop_region(img, x, y, width, height)
+            
+            crop_path = os.path.join(output_dir, filename)
+            if not cv2.imwrite(crop_path, crop):
+                print(f"Error cropping {name.lower()}: could not write {crop_path}")
+                continue
+            crops.append((name, crop_path, (crop.shape[1], crop.shape[0])))
+            # print(f"✓ {name} saved: {crop_path}")
+            # print(f"  Crop area: ({x}, {y}) to ({x + width}, {y + height})")
+            
+        except Exception as e:
+            print(f"Error cropping {name.lower()}: {e}")
     
     # Summary
     print(f"\n📊 Summary:")
-    print(f"Original image: {img.size[0]}x{img.size[1]} pixels")
+    print(f"Original image: {img.shape[1]}x{img.shape[0]} pixels")
     for name, path, size in crops:
         print(f"{name}: {size[0]}x{size[1]} pixels")
     
@@ -41,41 +41,27 @@ class CandleStrategyAnalyzer:
         self.rgb_image = self.unified_detector.rgb_image
         return True
     
+    def pixel_matches(self, color_name, r, g, b):
+        """Check a single pixel against a color's rules."""
+        # The shared rules take signed channel values plus their max / min;
+        # plain ints keep sums and differences from wrapping around like uint8
+        r, g, b = int(r), int(g), int(b)
+        mx, mn = max(r, g, b), min(r, g, b)
+        return all(rule(r, g, b, mx, mn) for rule in self.color_rules[color_name])
+    
     def detect_candles(self):
         """Detect candles by finding horizontal continuity of red/green pixels."""
         print("🕯️  Detecting candles using horizontal continuity approach...")
         
-        height, width = self.rgb_image.shape[:2]
-        
         # Step 1: Create a horizontal color map - for each x position, check if ANY pixel in that column is red or green
-        x_color_map = []  # List of (x, color) for each x position that has red or green pixels
-        
         # print("🎨 Scanning horizontal positions for red/green pixels...")
-        for x in range(width):
-            has_red = False
-            has_green = False
-            
-            # Check entire column for any red or green pixels
-            for y in range(height):
-                r, g, b = self.rgb_image[y, x]
-                
-                # Check for red pixels
-                if not has_red and all(rule(r, g, b) for rule in self.color_rules['red']):
-                    has_red = True
-                
-                # Check for green pixels  
-                if not has_green and all(rule(r, g, b) for rule in self.color_rules['green']):
-                    has_green = True
-                
-                # Early exit if both found
-                if has_red and has_green:
-                    break
-            
-            # Prioritize red over green if both present (red candles are more common)
-            if has_red:
-                x_color_map.append((x, 'red'))
-            elif has_green:
-                x_color_map.append((x, 'green'))
+        red_columns = self.unified_detector.detect_color_mask('red').any(axis=0)
+        green_columns = self.unified_detector.detect_color_mask('green').any(axis=0)
+        
+        # List of (x, color) for each x position that has red or green pixels;
+        # prioritize red over green if both present (red candles are more common)
+        x_color_map = [(x, 'red' if red_columns[x] else 'green')
+                       for x in np.flatnonzero(red_columns | green_columns).tolist()]
         
         # print(f"📍 Found {len(x_color_map)} x-positions with red/green pixels")
         
@@ -213,8 +199,7 @@ class CandleStrategyAnalyzer:
         if color_name not in self.color_rules:
             return False
         
-        rules = self.color_rules[color_name]
-        return all(rule(r, g, b) for rule in rules)
+        return self.pixel_matches(color_name, r, g, b)
     
     def validate_horizontal_line(self, color_name, x, y, pixels_range=30):
         """
@@ -17,103 +17,139 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from datetime import datetime
 
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
 class VisualCandleStrategyAnalyzer:
-    def __init__(self, image_path):
+    def __init__(self, image_path=None, *, bgr=None):
         """
         Initialize the visual strategy analyzer.
         
         Args:
             image_path (str): Path to the candlestick chart image
+            bgr (np.ndarray): Chart already decoded as an (H, W, 3) uint8 BGR array,
+                e.g. a cv2.imread result; used instead of reading image_path
         """
+        if image_path is None and bgr is None:
+            raise ValueError("Either image_path or bgr is required")
         self.image_path = image_path
+        self.bgr = bgr
         self.image_array = None
         self.rgb_image = None
         self.candle_positions = []
         self.candle_width = None
+        self.color_masks = {}  # color name -> (H, W) bool mask, filled on first use
+        self.channel_planes = None  # int16 (r, g, b, max, min) shared by every color's rules
         
-        # Color detection rules (synchronized with unified_color_detector.py)
+        # Color detection rules (synchronized with unified_color_detector.py).
+        # r, g, b are int16 arrays (or plain ints for a single pixel) and mx / mn
+        # their element-wise max / min, so conditions combine with & / |
         self.color_rules = {
             'red': [
-                lambda r, g, b: r > max(g, b) * 1.2,   # Red dominant but not as strict
-                lambda r, g, b: r > 100,               # High red value
-                lambda r, g, b: g < r * 0.6,           # Green much lower than red (stricter to avoid orange)
-                lambda r, g, b: b < r * 0.6,           # Blue much lower than red
-                lambda r, g, b: r - g > 50,            # Red significantly higher than green (avoid orange)
-                lambda r, g, b: max(r, g, b) - min(r, g, b) > 40,  # Good color variation
+                lambda r, g, b, mx, mn: r > np.maximum(g, b) * 1.2,   # Red dominant but not as strict
+                lambda r, g, b, mx, mn: r > 100,               # High red value
+                lambda r, g, b, mx, mn: g < r * 0.6,           # Green much lower than red (stricter to avoid orange)
+                lambda r, g, b, mx, mn: b < r * 0.6,           # Blue much lower than red
+                lambda r, g, b, mx, mn: r - g > 50,            # Red significantly higher than green (avoid orange)
+                lambda r, g, b, mx, mn: mx - mn > 40,  # Good color variation
             ],
             'green': [
-                lambda r, g, b: g > max(r, b),         # Green is highest component
-                lambda r, g, b: g > 50,                # Minimum green value
-                lambda r, g, b: g - max(r, b) > 10,    # Green noticeably higher (more lenient)
-                lambda r, g, b: max(r, g, b) - min(r, g, b) > 15,  # Some color variation
-                lambda r, g, b: g > 80 or (g > r * 1.5 and g > b * 0.8),  # Either bright green OR green dominant over red with reasonable blue
+                lambda r, g, b, mx, mn: g > np.maximum(r, b),         # Green is highest component
+                lambda r, g, b, mx, mn: g > 50,                # Minimum green value
+                lambda r, g, b, mx, mn: g - np.maximum(r, b) > 10,    # Green noticeably higher (more lenient)
+                lambda r, g, b, mx, mn: mx - mn > 15,  # Some color variation
+                lambda r, g, b, mx, mn: (g > 80) | ((g > r * 1.5) & (g > b * 0.8)),  # Either bright green OR green dominant over red with reasonable blue
             ],
             'orange': [
-                lambda r, g, b: r > g and g > b,       # R > G > B
-                lambda r, g, b: r > 80,                # High red
-                lambda r, g, b: g > 30 and g < r * 0.8,  # Medium green
-                lambda r, g, b: b < min(r, g) * 0.5,   # Low blue
-                lambda r, g, b: max(r, g, b) - min(r, g, b) > 25,  # Color variation
+                lambda r, g, b, mx, mn: (r > g) & (g > b),       # R > G > B
+                lambda r, g, b, mx, mn: r > 80,                # High red
+                lambda r, g, b, mx, mn: (g > 30) & (g < r * 0.8),  # Medium green
+                lambda r, g, b, mx, mn: b < np.minimum(r, g) * 0.5,   # Low blue
+                lambda r, g, b, mx, mn: mx - mn > 25,  # Color variation
             ],
             'purple': [
-                lambda r, g, b: b > max(r, g) * 1.05,  # Blue is the dominant component (stricter than fuchsia)
-                lambda r, g, b: g < min(r, b) * 0.5,   # Green much lower than red and blue
-                lambda r, g, b: r > 20 and r < 180,    # Red present but not too bright (distinct from fuchsia)
-                lambda r, g, b: b > 30 and b < 220,    # Blue present but not too bright
-                lambda r, g, b: max(r, g, b) - min(r, g, b) > 20,  # Good color variation
-                lambda r, g, b: b > r * 1.02,          # Blue slightly higher than red (purple characteristic)
-                lambda r, g, b: int(r) + int(b) < 2 * int(g) + 250,  # Not as bright as fuchsia
-                lambda r, g, b: abs(int(r) - int(b)) > 15,  # Red and blue should be different (not like fuchsia)
-                lambda r, g, b: r < 200,               # Red not too bright (exclude bright fuchsia)
+                lambda r, g, b, mx, mn: b > np.maximum(r, g) * 1.05,  # Blue is the dominant component (stricter than fuchsia)
+                lambda r, g, b, mx, mn: g < np.minimum(r, b) * 0.5,   # Green much lower than red and blue
+                lambda r, g, b, mx, mn: (r > 20) & (r < 180),    # Red present but not too bright (distinct from fuchsia)
+                lambda r, g, b, mx, mn: (b > 30) & (b < 220),    # Blue present but not too bright
+                lambda r, g, b, mx, mn: mx - mn > 20,  # Good color variation
+                lambda r, g, b, mx, mn: b > r * 1.02,          # Blue slightly higher than red (purple characteristic)
+                lambda r, g, b, mx, mn: r + b < 2 * g + 250,  # Not as bright as fuchsia
+                lambda r, g, b, mx, mn: abs(r - b) > 15,  # Red and blue should be different (not like fuchsia)
+                lambda r, g, b, mx, mn: r < 200,               # Red not too bright (exclude bright fuchsia)
             ],
             'yellow': [
-                lambda r, g, b: r > 100 and g > 100,   # High red and green (lowered threshold)
-                lambda r, g, b: abs(int(r) - int(g)) < 80,       # Red and green should be similar (more relaxed)
-                lambda r, g, b: b < min(r, g) * 0.65,  # Blue less than 65% of min(R,G) (more relaxed)
-                lambda r, g, b: b < 150,               # Blue absolute limit (increased)
-                lambda r, g, b: min(r, g) > max(r, g) * 0.6,   # R and G should be reasonably close (more relaxed)
-                lambda r, g, b: int(r) + int(g) > 2 * int(b) + 50,    # Yellow color space rule (more relaxed)
-                lambda r, g, b: r > g * 0.7 and g > r * 0.7,   # Neither R nor G dominates too much (more relaxed)
-                lambda r, g, b: r > 50 and g > 50,     # Minimum brightness to avoid dark colors
+                lambda r, g, b, mx, mn: (r > 100) & (g > 100),   # High red and green (lowered threshold)
+                lambda r, g, b, mx, mn: abs(r - g) < 80,       # Red and green should be similar (more relaxed)
+                lambda r, g, b, mx, mn: b < np.minimum(r, g) * 0.65,  # Blue less than 65% of min(R,G) (more relaxed)
+                lambda r, g, b, mx, mn: b < 150,               # Blue absolute limit (increased)
+                lambda r, g, b, mx, mn: np.minimum(r, g) > np.maximum(r, g) * 0.6,   # R and G should be reasonably close (more relaxed)
+                lambda r, g, b, mx, mn: r + g > 2 * b + 50,    # Yellow color space rule (more relaxed)
+                lambda r, g, b, mx, mn: (r > g * 0.7) & (g > r * 0.7),   # Neither R nor G dominates too much (more relaxed)
+                lambda r, g, b, mx, mn: (r > 50) & (g > 50),     # Minimum brightness to avoid dark colors
             ],
             'blue': [
-                lambda r, g, b: b > max(r, g) * 1.2,   # Blue significantly dominant
-                lambda r, g, b: max(r, g, b) - min(r, g, b) > 15,  # Color variation
-                lambda r, g, b: b > 40,                # Blue present
+                lambda r, g, b, mx, mn: b > np.maximum(r, g) * 1.2,   # Blue significantly dominant
+                lambda r, g, b, mx, mn: mx - mn > 15,  # Color variation
+                lambda r, g, b, mx, mn: b > 40,                # Blue present
             ],
             'gray': [
-                lambda r, g, b: abs(int(r) - int(g)) <= 15,  # Red and green are similar
-                lambda r, g, b: abs(int(g) - int(b)) <= 15,  # Green and blue are similar
-                lambda r, g, b: abs(int(r) - int(b)) <= 15,  # Red and blue are similar
-                lambda r, g, b: max(r, g, b) - min(r, g, b) <= 20,  # Low color variation
-                lambda r, g, b: min(r, g, b) >= 50,    # Exclude black colors (raised from 10 to 50)
-                lambda r, g, b: max(r, g, b) <= 200,   # Not pure white (to avoid very bright whites)
-                lambda r, g, b: max(r, g, b) >= 70,    # Ensure it's bright enough to be considered gray
+                lambda r, g, b, mx, mn: abs(r - g) <= 15,  # Red and green are similar
+                lambda r, g, b, mx, mn: abs(g - b) <= 15,  # Green and blue are similar
+                lambda r, g, b, mx, mn: abs(r - b) <= 15,  # Red and blue are similar
+                lambda r, g, b, mx, mn: mx - mn <= 20,  # Low color variation
+                lambda r, g, b, mx, mn: mn >= 50,    # Exclude black colors (raised from 10 to 50)
+                lambda r, g, b, mx, mn: mx <= 200,   # Not pure white (to avoid very bright whites)
+                lambda r, g, b, mx, mn: mx >= 70,    # Ensure it's bright enough to be considered gray
             ],
             'fuchsia': [
-                lambda r, g, b: r > 150 and b > 150,   # High red and blue
-                lambda r, g, b: g < min(r, b) * 0.7,   # Green much lower than red and blue
-                lambda r, g, b: abs(int(r) - int(b)) < 80,  # Red and blue should be reasonably similar
-                lambda r, g, b: max(r, b) > g * 1.5,   # Either red or blue dominates over green
-                lambda r, g, b: max(r, g, b) - min(r, g, b) > 40,  # Good color variation
-                lambda r, g, b: int(r) + int(b) > 2 * int(g) + 100,   # Fuchsia color space rule
+                lambda r, g, b, mx, mn: (r > 150) & (b > 150),   # High red and blue
+                lambda r, g, b, mx, mn: g < np.minimum(r, b) * 0.7,   # Green much lower than red and blue
+                lambda r, g, b, mx, mn: abs(r - b) < 80,  # Red and blue should be reasonably similar
+                lambda r, g, b, mx, mn: np.maximum(r, b) > g * 1.5,   # Either red or blue dominates over green
+                lambda r, g, b, mx, mn: mx - mn > 40,  # Good color variation
+                lambda r, g, b, mx, mn: r + b > 2 * g + 100,   # Fuchsia color space rule
             ],
             'aqua': [
-                lambda r, g, b: b > 100 and g > 100,   # High blue and green components
-                lambda r, g, b: r < min(b, g) * 0.6,   # Red significantly lower than blue and green
-                lambda r, g, b: b >= g * 0.9,          # Blue should be at least 90% of green (allows blue to be slightly lower)
-                lambda r, g, b: g >= b * 0.8,          # Green should be at least 80% of blue (allows green to be slightly lower)
-                lambda r, g, b: g > r * 1.2,           # Green should be significantly higher than red
-                lambda r, g, b: b > r * 1.2,           # Blue should be significantly higher than red
-                lambda r, g, b: abs(int(b) - int(g)) < 80,  # Blue and green should be reasonably close
-                lambda r, g, b: int(b) + int(g) > 2 * int(r) + 80,   # Aqua color space rule
-                lambda r, g, b: max(b, g, r) - min(b, g, r) > 30,  # Good color variation
+                lambda r, g, b, mx, mn: (b > 100) & (g > 100),   # High blue and green components
+                lambda r, g, b, mx, mn: r < np.minimum(b, g) * 0.6,   # Red significantly lower than blue and green
+                lambda r, g, b, mx, mn: b >= g * 0.9,          # Blue should be at least 90% of green (allows blue to be slightly lower)
+                lambda r, g, b, mx, mn: g >= b * 0.8,          # Green should be at least 80% of blue (allows green to be slightly lower)
+                lambda r, g, b, mx, mn: g > r * 1.2,           # Green should be significantly higher than red
+                lambda r, g, b, mx, mn: b > r * 1.2,           # Blue should be significantly higher than red
+                lambda r, g, b, mx, mn: abs(b - g) < 80,  # Blue and green should be reasonably close
+                lambda r, g, b, mx, mn: b + g > 2 * r + 80,   # Aqua color space rule
+                lambda r, g, b, mx, mn: mx - mn > 30,  # Good color variation
             ]
         }
     
+    def _read_with_opencv(self):
+        """Decode the image as 8-bit BGR with OpenCV, or return None to fall back to PIL."""
+        if self.bgr is not None:
+            return self.bgr
+        if cv2 is None:
+            return None
+        return cv2.imread(self.image_path, cv2.IMREAD_COLOR)
+    
     def load_image(self):
         """Load and prepare the image for analysis."""
+        self.color_masks = {}
+        self.channel_planes = None
         try:
+            bgr_image = self._read_with_opencv()
+            if bgr_image is not None:
+                # Already a contiguous 3-channel array (alpha dropped, gray expanded);
+                # reversing the channels with NumPy keeps a preloaded array usable without cv2
+                if cv2 is not None:
+                    self.rgb_image = cv2.cvtColor(bgr_image, cv2.COLOR_BGR2RGB)
+                else:
+                    self.rgb_image = np.ascontiguousarray(bgr_image[:, :, ::-1])
+                self.image_array = self.rgb_image
+                print(f"✅ RGB image shape: {self.rgb_image.shape}")
+                return True
+            
             pil_image = Image.open(self.image_path)
             self.image_array = np.array(pil_image)
             # print(f"✅ Image loaded: {self.image_array.shape}")
@@ -121,7 +157,10 @@ class VisualCandleStrategyAnalyzer:
             # Convert to RGB (handle RGBA)
             if len(self.image_array.shape) == 3:
                 if self.image_array.shape[2] == 4:  # RGBA
-                    self.rgb_image = self.image_array[:, :, :3]
+                    # Copy the color channels out once into a contiguous RGB
+                    # buffer and drop the RGBA array instead of keeping both
+                    self.rgb_image = np.ascontiguousarray(self.image_array[:, :, :3])
+                    self.image_array = self.rgb_image
                 else:  # RGB
                     self.rgb_image = self.image_array
             else:
@@ -135,41 +174,36 @@ class VisualCandleStrategyAnalyzer:
             print(f"❌ Error loading image: {e}")
             return False
     
+    def color_mask(self, color_name):
+        """Return the (H, W) boolean mask of pixels matching a color's rules."""
+        # Each color is classified once per image; every scan afterwards is a lookup
+        if color_name in self.color_masks:
+            return self.color_masks[color_name]
+        
+        if self.channel_planes is None:
+            # Contiguous int16 r, g, b planes (unit-stride per channel), built once per image
+            r, g, b = np.moveaxis(self.rgb_image, -1, 0).astype(np.int16, order='C')
+            self.channel_planes = (r, g, b, np.maximum(np.maximum(r, g), b), np.minimum(np.minimum(r, g), b))
+        r, g, b, mx, mn = self.channel_planes
+        mask = np.ones(r.shape, dtype=bool)
+        for rule in self.color_rules[color_name]:
+            mask &= rule(r, g, b, mx, mn)
+        self.color_masks[color_name] = mask
+        return mask
+    
     def detect_candles(self):
         """Detect candles by finding horizontal continuity of red/green pixels."""
         # print("🕯️  Detecting candles using horizontal continuity approach...")
         
-        height, width = self.rgb_image.shape[:2]
-        
         # Step 1: Create a horizontal color map - for each x position, check if ANY pixel in that column is red or green
-        x_color_map = []  # List of (x, color) for each x position that has red or green pixels
-        
         # print("🎨 Scanning horizontal positions for red/green pixels...")
-        for x in range(width):
-            has_red = False
-            has_green = False
-            
-            # Check entire column for any red or green pixels
-            for y in range(height):
-                r, g, b = self.rgb_image[y, x]
-                
-                # Check for red pixels
-                if not has_red and all(rule(r, g, b) for rule in self.color_rules['red']):
-                    has_red = True
-                
-                # Check for green pixels  
-                if not has_green and all(rule(r, g, b) for rule in self.color_rules['green']):
-                    has_green = True
-                
-                # Early exit if both found
-                if has_red and has_green:
-                    break
-            
-            # Prioritize red over green if both present (red candles are more common)
-            if has_red:
-                x_color_map.append((x, 'red'))
-            elif has_green:
-                x_color_map.append((x, 'green'))
+        red_columns = self.color_mask('red').any(axis=0)
+        green_columns = self.color_mask('green').any(axis=0)
+        
+        # List of (x, color) for each x position that has red or green pixels;
+        # prioritize red over green if both present (red candles are more common)
+        x_color_map = [(x, 'red' if red_columns[x] else 'green')
+                       for x in np.flatnonzero(red_columns | green_columns).tolist()]
         
         # print(f"📍 Found {len(x_color_map)} x-positions with red/green pixels")
         
@@ -303,13 +337,17 @@ class VisualCandleStrategyAnalyzer:
             y < 0 or y >= self.rgb_image.shape[0]):
             return False
         
-        r, g, b = self.rgb_image[y, x]
-        
         if color_name not in self.color_rules:
             return False
         
-        rules = self.color_rules[color_name]
-        return all(rule(r, g, b) for rule in rules)
+        return bool(self.color_mask(color_name)[y, x])
+    
+    def column_positions(self, color_name, x, y_range):
+        """Return the y positions in y_range of column x whose pixel matches a color."""
+        if x < 0 or x >= self.rgb_image.shape[1] or color_name not in self.color_rules:
+            return np.empty(0, dtype=np.intp)
+        column = self.color_mask(color_name)[y_range.start:y_range.stop, x]
+        return np.flatnonzero(column) + y_range.start
     
     def validate_horizontal_line(self, color_name, x, y, pixels_range=30):
         """
@@ -328,29 +366,17 @@ class VisualCandleStrategyAnalyzer:
             y < 0 or y >= self.rgb_image.shape[0]):
             return False
         
+        if color_name not in self.color_rules:
+            return False
+        
         width = self.rgb_image.shape[1]
+        row = self.color_mask(color_name)[y]
         
-        # Check left side (exactly 45 pixels)
-        left_valid = True
-        for dx in range(1, pixels_range + 1):
-            check_x = x - dx
-            if check_x < 0:
-                left_valid = False
-                break
-            if not self.detect_color_at_position(color_name, check_x, y):
-                left_valid = False
-                break
+        # Check left side (exactly 45 pixels), all in the image and all matching
+        left_valid = x - pixels_range >= 0 and bool(row[x - pixels_range:x].all())
         
         # Check right side (exactly 45 pixels)
-        right_valid = True
-        for dx in range(1, pixels_range + 1):
-            check_x = x + dx
-            if check_x >= width:
-                right_valid = False
-                break
-            if not self.detect_color_at_position(color_name, check_x, y):
-                right_valid = False
-                break
+        right_valid = x + pixels_range < width and bool(row[x + 1:x + pixels_range + 1].all())
         
         # Valid horizontal line only if we have exactly 45 pixels on both sides
         return left_valid and right_valid
@@ -369,14 +395,10 @@ class VisualCandleStrategyAnalyzer:
         
         print(f"🔍 Scanning x={x} for {colors} in direction '{direction}' (y range: {min(y_range)}-{max(y_range)})")
         
+        # Positions come straight from each color's cached mask column
         color_detections = {}
         for color in colors:
-            color_detections[color] = []
-        
-        for y in y_range:
-            for color in colors:
-                if self.detect_color_at_position(color, x, y):
-                    color_detections[color].append(y)
+            color_detections[color] = self.column_positions(color, x, y_range).tolist()
         
         # Report findings and return first color found with positions
         for color in colors:
@@ -412,14 +434,9 @@ class VisualCandleStrategyAnalyzer:
         print(f"🔍 Scanning x={x} for {colors} with horizontal validation in direction '{direction}'")
         
         for color in colors:
-            validated_positions = []
-            
-            # Scan for the color
-            for y in y_range:
-                if self.detect_color_at_position(color, x, y):
-                    # Found the color, now validate horizontal line
-                    if self.validate_horizontal_line(color, x, y):
-                        validated_positions.append(y)
+            # Scan for the color, then validate a horizontal line at each hit
+            validated_positions = [y for y in self.column_positions(color, x, y_range).tolist()
+                                   if self.validate_horizontal_line(color, x, y)]
             
             # If we found valid horizontal lines for this color, return it
             if validated_positions:
@@ -447,15 +464,12 @@ class VisualCandleStrategyAnalyzer:
         height = self.rgb_image.shape[0]
         
         # Step 1: First scan the vertical line to see if we hit aqua or fuchsia at all
-        aqua_pixels = []
-        fuchsia_pixels = []
-        
         print("🔍 Step 1: Scanning vertical line for aqua/fuchsia pixels...")
-        for y in range(height):
-            if self.detect_color_at_position('aqua', candle_x, y):
-                aqua_pixels.append(y)
-            elif self.detect_color_at_position('fuchsia', candle_x, y):
-                fuchsia_pixels.append(y)
+        aqua_rows = self.column_positions('aqua', candle_x, range(height))
+        fuchsia_rows = self.column_positions('fuchsia', candle_x, range(height))
+        # A pixel matching both counts as aqua only
+        aqua_pixels = aqua_rows.tolist()
+        fuchsia_pixels = np.setdiff1d(fuchsia_rows, aqua_rows, assume_unique=True).tolist()
         
         print(f"   Found {len(aqua_pixels)} aqua pixels and {len(fuchsia_pixels)} fuchsia pixels")
         
@@ -486,8 +500,15 @@ class VisualCandleStrategyAnalyzer:
         print("❌ No valid horizontal lines found (90 pixel requirement not met)")
         return 'none', aqua_pixels, fuchsia_pixels
     
-    def create_visual_analysis(self, candle_x):
-        """Create a comprehensive visual analysis showing all detection steps."""
+    def create_visual_analysis(self, candle_x, show=False):
+        """
+        Create a comprehensive visual analysis showing all detection steps.
+        
+        Args:
+            candle_x (int): Column of the candle being analyzed
+            show (bool): Also open the figure in a matplotlib window; by default
+                it is only saved, so batch callers don't block on the GUI
+        """
         print("🎨 Creating visual analysis...")
         
         # Create figure with multiple subplots (2x3 grid for the new indicator)
@@ -542,9 +563,10 @@ class VisualCandleStrategyAnalyzer:
         stm_color, stm_positions = self.scan_vertical_line_for_colors(candle_x, ['orange', 'purple'], 'down')
         
         if stm_color != 'none':
-            for y_pos in stm_positions[:10]:  # Show first 10 detections
-                color_rgb = 'orange' if stm_color == 'orange' else 'purple'
-                ax2.plot(candle_x, y_pos, 'o', color=color_rgb, markersize=8, alpha=0.8)
+            # Show first 10 detections, all markers in one call
+            color_rgb = 'orange' if stm_color == 'orange' else 'purple'
+            marked = stm_positions[:10]
+            ax2.plot([candle_x] * len(marked), marked, 'o', color=color_rgb, markersize=8, alpha=0.8)
             
             # Add result text
             result_text = 'BUY' if stm_color == 'orange' else 'SELL'
@@ -569,9 +591,10 @@ class VisualCandleStrategyAnalyzer:
         td_color, td_positions = self.scan_vertical_line_for_colors(candle_x, ['yellow', 'blue'], 'both')
         
         if td_color != 'none':
-            for y_pos in td_positions[:10]:  # Show first 10 detections
-                color_rgb = 'yellow' if td_color == 'yellow' else 'blue'
-                ax3.plot(candle_x, y_pos, 's', color=color_rgb, markersize=8, alpha=0.8)
+            # Show first 10 detections, all markers in one call
+            color_rgb = 'yellow' if td_color == 'yellow' else 'blue'
+            marked = td_positions[:10]
+            ax3.plot([candle_x] * len(marked), marked, 's', color=color_rgb, markersize=8, alpha=0.8)
             
             # Add result text
             result_text = 'BUY' if td_color == 'yellow' else 'SELL'
@@ -595,12 +618,10 @@ class VisualCandleStrategyAnalyzer:
         # Perform Horizontal Line analysis with correct logic
         hl_signal, aqua_pixels, fuchsia_pixels = self.analyze_horizontal_line_signal(candle_x)
         
-        # Mark all detected pixels (before validation)
-        for y_pos in aqua_pixels[:10]:  # Show first 10 aqua pixels
-            ax4.plot(candle_x, y_pos, 'o', color='aqua', markersize=6, alpha=0.6)
-        
-        for y_pos in fuchsia_pixels[:10]:  # Show first 10 fuchsia pixels
-            ax4.plot(candle_x, y_pos, 'o', color='fuchsia', markersize=6, alpha=0.6)
+        # Mark all detected pixels (before validation), first 10 of each color
+        for pixels, color in ((aqua_pixels[:10], 'aqua'), (fuchsia_pixels[:10], 'fuchsia')):
+            if pixels:
+                ax4.plot([candle_x] * len(pixels), pixels, 'o', color=color, markersize=6, alpha=0.6)
         
         # Show validation results
         if hl_signal != 'none':
@@ -739,12 +760,15 @@ Horizontal Line Signal (Looking Both Ways):
         plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
         
         print(f"💾 Visual analysis saved to: {output_path}")
-        plt.show()
+        if show:
+            plt.show()
+        # Free the figure so repeated runs don't accumulate them
+        plt.close(fig)
         
         return results, output_path
     
-    def run_visual_analysis(self):
-        """Run the complete visual strategy analysis."""
+    def run_visual_analysis(self, show=False):
+        """Run the complete visual strategy analysis (show: see create_visual_analysis)."""
         print("🚀 Starting Visual Strategy Analysis")
         print("=" * 60)
         
@@ -769,7 +793,7 @@ Horizontal Line Signal (Looking Both Ways):
         print("📈 CREATING VISUAL ANALYSIS")
         print("=" * 60)
         
-        results, output_path = self.create_visual_analysis(candle_x)
+        results, output_path = self.create_visual_analysis(candle_x, show=show)
         
         # print(f"\n🎯 FINAL RESULTS:")
         # print(f"STM Signal: {results['STM']}")
@@ -792,7 +816,7 @@ def main():
     analyzer = VisualCandleStrategyAnalyzer(image_path)
     
     # Run visual analysis
-    results = analyzer.run_visual_analysis()
+    results = analyzer.run_visual_analysis(show=True)
     
     # Output final JSON
     if "error" not in results:
@@ -1,6 +1,11 @@
+import os
+import sys
+import matplotlib
+# Render off-screen on Linux boxes without a display (batch / SSH runs)
+if sys.platform.startswith('linux') and not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY')):
+    matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import matplotlib.image as mpimg
-import os
 
 def view_analysis_results():
     """
@@ -23,7 +28,8 @@ def view_analysis_results():
         plt.savefig('analysis_results_view.png', dpi=150, bbox_inches='tight')
         print("Results also saved as 'analysis_results_view.png' for easy viewing")
         
-        plt.show()
+        if matplotlib.get_backend().lower() != 'agg':
+            plt.show()
         
         # Print summary
         print("\n" + "="*60)